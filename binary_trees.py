@@ -5,12 +5,27 @@
 import networkx as nx
 from networkx.drawing.nx_agraph import graphviz_layout
 from matplotlib import pyplot as plt
+from bloom_filter import CountingBloomFilter
+from bisect import bisect_left
+from collections import deque
+import heapq
+import json
+import math
+import mmap
+import os
 import random
+import statistics
+import struct
+import sys
+import threading
 import time
+import tracemalloc
 
 
 class SinglyLinkedListNode:
     """A node with a value and a reference to the next node."""
+    __slots__ = ('value', 'next')   # No per-node __dict__.
+
     def __init__(self, data):
         self.value, self.next = data, None
 
@@ -19,6 +34,7 @@ class SinglyLinkedList:
     """A singly linked list with a head and a tail."""
     def __init__(self):
         self.head, self.tail = None, None
+        self.filter = None      # Optional CountingBloomFilter of the values.
 
     def append(self, data):
         """Add a node containing the data to the end of the list."""
@@ -28,6 +44,42 @@ class SinglyLinkedList:
         else:
             self.tail.next = n
             self.tail = n
+        if self.filter is not None:
+            self.filter.add(data)
+
+    def use_filter(self, capacity=None, error_rate=0.01):
+        """Keep a Bloom filter of the values in the list, so that searches
+        for values that are not in the list usually return without walking
+        it. The filter is sized for capacity values, which defaults to twice
+        the current length (and at least 1024).
+        """
+        values = []
+        current = self.head
+        while current is not None:
+            values.append(current.value)
+            current = current.next
+        if capacity is None:
+            capacity = max(1024, 2*len(values))
+        self.filter = CountingBloomFilter(capacity, error_rate)
+        for x in values:
+            self.filter.add(x)
+
+    def get(self, data, default=None):
+        """Return the first node containing the data, or default if there is
+        no such node. Never raises, so a miss costs no exception.
+        """
+        if self.filter is not None and data not in self.filter:
+            return default
+        current = self.head
+        while current is not None:
+            if current.value == data:
+                return current
+            current = current.next
+        return default
+
+    def __contains__(self, data):
+        """Return True if some node contains the data."""
+        return self.get(data) is not None
 
     def iterative_find(self, data):
         """Search iteratively for a node containing the data.
@@ -37,40 +89,39 @@ class SinglyLinkedList:
         Returns:
             (SinglyLinkedListNode): the node containing the data.
         """
-        current = self.head
-        while current is not None:
-            if current.value == data:
-                return current
-            current = current.next
-        raise ValueError(str(data) + " is not in the list")
+        node = self.get(data)
+        if node is None:
+            raise ValueError(str(data) + " is not in the list")
+        return node
        
     def recursive_find(self, data):
-        """Search recursively for the node containing the data.
+        """Search for the node containing the data by checking a node and then
+        stepping to the rest of the list. The tail recursion is unrolled into
+        a loop so long lists do not hit Python's recursion limit.
         If there is no such node in the list, including if the list is empty,
         raise a ValueError.
 
         Returns:
             (SinglyLinkedListNode): the node containing the data.
         """
-        current = self.head
-        def node_check(node):
-            '''Checks if a node matches the data'''
+        node = self.head
+        while True:
             #first base case if data not found
             if node is None:
                 raise ValueError('Data could not be found')
             #second base case if data found
             if node.value == data:
                 return node
-            #start recursion
-            else:
-                return node_check(node.next)
-        return node_check(current)
+            #step to the rest of the list
+            node = node.next
 
 
 class BSTNode:
     """A node class for binary search trees. Contains a value, a
     reference to the parent node, and references to two child nodes.
     """
+    __slots__ = ('value', 'prev', 'left', 'right', 'height', 'size')
+
     def __init__(self, data):
         """Construct a new node and set the value attribute. The other
         attributes will be set when the node is added to a tree.
@@ -79,6 +130,8 @@ class BSTNode:
         self.prev = None        # A reference to this node's parent node.
         self.left = None        # self.left.value < self.value
         self.right = None       # self.value < self.right.value
+        self.height = 0         # Length of the longest chain down to a leaf.
+        self.size = 1           # Number of nodes in this node's subtree.
 
 
 class BST:
@@ -88,28 +141,134 @@ class BST:
     def __init__(self):
         """Initialize the root attribute."""
         self.root = None
+        self.filter = None      # Optional CountingBloomFilter of the values.
 
-    def find(self, data):
-        """Return the node containing the data. If there is no such node
-        in the tree, including if the tree is empty, raise a ValueError.
+    @classmethod
+    def from_sorted(cls, iterable):
+        """Build a perfectly balanced tree from data that is already in
+        strictly increasing order. This takes a single O(n) pass instead of
+        n calls to insert().
+
+        Raises:
+            ValueError: if the data is not strictly increasing.
+
+        Example:
+            >>> print(BST.from_sorted([1, 3, 4, 5, 6, 7, 8]))
+            [5]
+            [3, 7]
+            [1, 4, 6, 8]
+        """
+        values = list(iterable)
+        #check that the data is sorted and has no duplicates
+        for i in range(1, len(values)):
+            if not values[i-1] < values[i]:
+                raise ValueError('Data must be strictly increasing')
+        tree = cls()
+        tree.root = BST._build(values, 0, len(values), None)
+        return tree
+
+    @classmethod
+    def from_iterable(cls, iterable):
+        """Sort the data once, then build a perfectly balanced tree from it.
+
+        Raises:
+            ValueError: if the data contains duplicates.
+        """
+        return cls.from_sorted(sorted(iterable))
+
+    @staticmethod
+    def _build(values, start, stop, parent):
+        """Build a balanced subtree from values[start:stop], attach it to the
+        parent node, and return its root. The middle value becomes the root so
+        the recursion is only O(log n) deep.
+        """
+        if start >= stop:               # Base case: empty subtree.
+            return None
+        mid = (start + stop) // 2
+        n = BSTNode(values[mid])
+        n.prev = parent
+        n.left = BST._build(values, start, mid, n)
+        n.right = BST._build(values, mid + 1, stop, n)
+        BST._update(n)
+        return n
+
+    @staticmethod
+    def _update(n):
+        """Recompute the stored height and subtree size of n from its
+        children, which must already be correct.
+        """
+        left, right = n.left, n.right
+        if left is None:
+            if right is None:
+                n.height, n.size = 0, 1
+            else:
+                n.height, n.size = right.height + 1, right.size + 1
+        elif right is None:
+            n.height, n.size = left.height + 1, left.size + 1
+        else:
+            n.height = 1 + (left.height if left.height > right.height
+                            else right.height)
+            n.size = 1 + left.size + right.size
+
+    def _retrace(self, n):
+        """Walk from n up to the root, updating the stored heights and
+        subtree sizes after a node below n was added or removed.
+        """
+        while n is not None:
+            BST._update(n)
+            n = n.prev
+
+    def __len__(self):
+        """Return the number of nodes in the tree."""
+        root = self.root
+        return 0 if root is None else root.size
+
+    def use_filter(self, capacity=None, error_rate=0.01):
+        """Keep a Bloom filter of the values in the tree, so that searches
+        for values that are not in the tree usually return in O(1) without
+        walking it. The filter is sized for capacity values, which defaults
+        to twice the current size (and at least 1024). Trees made from this
+        one, such as by split() or union(), do not inherit the filter.
+
+        Hashing a value costs about as much as a few comparisons, so this
+        pays off most for deep trees and expensive comparisons; a balanced
+        tree of ints is about as fast without it.
         """
+        if capacity is None:
+            capacity = max(1024, 2*len(self))
+        self.filter = CountingBloomFilter(capacity, error_rate)
+        for x in self:
+            self.filter.add(x)
 
-        # Define a recursive function to traverse the tree.
-        def _step(current):
-            """Recursively step through the tree until the node containing
-            the data is found. If there is no such node, raise a Value Error.
-            """
-            if current is None:                     # Base case 1: dead end.
-                raise ValueError(str(data) + " is not in the tree.")
-            if data == current.value:               # Base case 2: data found!
+    def get(self, data, default=None):
+        """Return the node containing the data, or default if there is no
+        such node. Never raises, so a miss costs no exception.
+        """
+        if self.filter is not None and data not in self.filter:
+            return default
+        current = self.root
+        # Step down the tree until the node containing the data is found.
+        while current is not None:
+            if data == current.value:               # Data found!
                 return current
-            if data < current.value:                # Recursively search left.
-                return _step(current.left)
-            else:                                   # Recursively search right.
-                return _step(current.right)
+            if data < current.value:                # Search left.
+                current = current.left
+            else:                                   # Search right.
+                current = current.right
+        return default                              # Dead end.
 
-        # Start the recursion on the root of the tree.
-        return _step(self.root)
+    def __contains__(self, data):
+        """Return True if the data is in the tree."""
+        return self.get(data) is not None
+
+    def find(self, data):
+        """Return the node containing the data. If there is no such node
+        in the tree, including if the tree is empty, raise a ValueError.
+        """
+        node = self.get(data)
+        if node is None:
+            raise ValueError(str(data) + " is not in the tree.")
+        return node
 
     def insert(self, data):
         """Insert a new node containing the specified data.
@@ -131,6 +290,8 @@ class BST:
         #check if empty
         if self.root is None:
             self.root = BSTNode(data)
+            if self.filter is not None:
+                self.filter.add(data)
         else:
             current = self.root
             new_node = BSTNode(data)
@@ -142,6 +303,9 @@ class BST:
                     if current.left is None:
                         current.left = new_node
                         new_node.prev = current
+                        if self.filter is not None:
+                            self.filter.add(data)
+                        self._retrace(current)
                         return current
                     #try again with the next node
                     else:
@@ -152,6 +316,9 @@ class BST:
                     if current.right is None:
                         current.right = new_node
                         new_node.prev = current
+                        if self.filter is not None:
+                            self.filter.add(data)
+                        self._retrace(current)
                         return current
                     #try again with the next node
                     else:
@@ -191,110 +358,385 @@ class BST:
             []                                  | ValueError: <message>
         """
         target = self.find(data)
-        target_val = target.value
+        if self.filter is not None:
+            self.filter.remove(data)
+        #if target has two children, take the value of its in-order
+        #predecessor and remove the predecessor's node instead
+        if target.left is not None and target.right is not None:
+            swap_node = target.left
+            #find the left-right most node
+            while swap_node.right is not None:
+                swap_node = swap_node.right
+            target.value = swap_node.value
+            target = swap_node
+        #target now has at most one child, so splice it out of the tree
+        child = target.left if target.left is not None else target.right
         parent = target.prev
+        if child is not None:
+            child.prev = parent
         #if target is the root
         if parent is None:
-            #two children, pass it to the other case since parent is not needed
-            if target.right is not None and target.left is not None:
-                swap_node = target.left
-                #find the left-right most node
-                while swap_node.right is not None:
-                    swap_node = swap_node.right
-                swap_node_val = swap_node.value
-                #swap the nodes
-                swap_node.value = target_val
-                target.value = swap_node_val
-                #remove the new target node if the predecessor is a leaf
-                if swap_node.left is None:
-                    if swap_node.prev.left is not None:
-                        if swap_node.prev.left.value == target_val:
-                            swap_node.prev.left = None
-                        else:
-                            swap_node.prev.right = None
-                    else:
-                        swap_node.prev.right = None
-                #remove the new target node if the predecessor has a left child
-                else:
-                    if swap_node.prev.left is not None:
-                        if swap_node.prev.left.value == target_val:
-                            swap_node.prev.left = swap_node.left
-                        else:
-                            swap_node.prev.right = swap_node.left
-                    else:
-                        swap_node.prev.right = swap_node.left
-            #right child
-            elif target.right is not None:
-                self.root = target.right
-                target.right.prev = None
-            #left child
-            elif target.left is not None:
-                self.root = target.left
-                target.left.prev = None
-            #no children
-            else:
-                self.root = None
-        #if target has no children
-        elif target.right is None and target.left is None:
-            if parent.right is not None:
-                if parent.right.value == data:
-                    parent.right = None
-                else:
-                    parent.left = None
-            else:
-                parent.left = None
-        #if target only has a left child
-        elif target.right is None:
-            if parent.right is not None:
-                if parent.right.value == data:
-                    parent.right = target.left
-                    target.left.prev = parent
-                else:
-                    parent.left = target.left
-                    target.left.prev = parent
+            self.root = child
+        elif parent.left is target:
+            parent.left = child
+        else:
+            parent.right = child
+        self._retrace(parent)
+        #return the lowest node whose subtree changed
+        return parent
+
+    def rank(self, data):
+        """Return the number of values in the tree that are strictly less
+        than the data. The data does not need to be in the tree.
+
+        Example:
+            >>> tree = BST.from_sorted([1, 3, 4, 5, 6, 7, 8])
+            >>> tree.rank(5), tree.rank(2), tree.rank(9)
+            (3, 1, 7)
+        """
+        return self._count_below(self.root, data, False)
+
+    def select(self, k):
+        """Return the node containing the k-th smallest value in the tree,
+        counting from 0.
+
+        Raises:
+            IndexError: if k is negative or greater than or equal to the
+                number of nodes in the tree.
+        """
+        #read the root once, so a concurrent writer cannot swap it mid-walk
+        current = self.root
+        if k < 0 or current is None or k >= current.size:
+            raise IndexError('BST index out of range')
+        #step down, skipping whole left subtrees that are too small
+        while True:
+            left_size = 0 if current.left is None else current.left.size
+            if k < left_size:
+                current = current.left
+                continue
+            #the node itself counts once, or not at all if it is a tombstone
+            own = current.size - left_size - (
+                0 if current.right is None else current.right.size)
+            if k < left_size + own:
+                return current
+            k -= left_size + own
+            current = current.right
+
+    def count_range(self, low, high):
+        """Return the number of values in the tree between low and high,
+        including the endpoints.
+        """
+        if high < low:
+            return 0
+        #both counts must come from the same version of the tree
+        root = self.root
+        return (self._count_below(root, high, True)
+                - self._count_below(root, low, False))
+
+    @staticmethod
+    def _count_below(root, data, inclusive):
+        """Count the values less than the data (or equal to it, if inclusive)
+        with a single walk from root.
+        """
+        count, current = 0, root
+        while current is not None:
+            if current.value < data or (inclusive and current.value == data):
+                #this node and its whole left subtree are below the data
+                count += current.size - (
+                    0 if current.right is None else current.right.size)
+                current = current.right
             else:
-                parent.left = target.left
-                target.left.prev = parent
-        #if target only has a right child
-        elif target.left is None:
-            if parent.right is not None:
-                if parent.right.value == data:
-                    parent.right = target.right
-                    target.right.prev = parent
+                current = current.left
+        return count
+
+    def find_many(self, iterable):
+        """Return a list of the nodes containing each of the data, in the same
+        order. A batch of at least half the tree is sorted once and the tree
+        is walked a single time, splitting the sorted batch at each node, so
+        no node is visited twice. Smaller batches are cheaper to look up one
+        by one with get().
+
+        Raises:
+            ValueError: if some data is not in the tree.
+        """
+        queries = list(iterable)
+        if 2*len(queries) < len(self):
+            result = [self.get(x) for x in queries]
+            for x, node in zip(queries, result):
+                if node is None:
+                    raise ValueError(str(x) + " is not in the tree.")
+            return result
+        order = sorted(range(len(queries)), key=queries.__getitem__)
+        targets = [queries[i] for i in order]
+        result = [None]*len(queries)
+        #each stack entry is a node and the nonempty slice of targets in
+        #its subtree
+        stack = [(self.root, 0, len(targets))] if targets else []
+        while stack:
+            current, start, stop = stack.pop()
+            if current is None:
+                raise ValueError(str(targets[start]) + " is not in the tree.")
+            value = current.value
+            i = j = bisect_left(targets, value, start, stop)
+            while j < stop and targets[j] == value:
+                result[order[j]] = current
+                j += 1
+            if start < i:
+                stack.append((current.left, start, i))
+            if j < stop:
+                stack.append((current.right, j, stop))
+        return result
+
+    def insert_many(self, iterable):
+        """Insert all of the data at once. The data are sorted and the tree is
+        walked a single time, splitting the sorted batch at each node. Each
+        run of data that falls off the end of a branch is attached there as a
+        balanced subtree, then the walked nodes are updated from the bottom
+        up. Nothing is inserted if any data is a duplicate.
+
+        Raises:
+            ValueError: if some data is already in the tree, or appears in
+                the batch more than once.
+        """
+        values = sorted(iterable)
+        for i in range(1, len(values)):
+            if not values[i-1] < values[i]:
+                raise ValueError('Node already in BST')
+        if self.root is None:
+            self.root = BST._build(values, 0, len(values), None)
+            self._filter_all(values)
+            return
+        #find where each run of values goes before changing anything
+        visited, attach = [], []
+        stack = [(self.root, 0, len(values))]
+        while stack:
+            current, start, stop = stack.pop()
+            i = bisect_left(values, current.value, start, stop)
+            if i < stop and values[i] == current.value:
+                raise ValueError('Node already in BST')
+            visited.append(current)
+            for child, side, first, last in ((current.left, 'left', start, i),
+                                             (current.right, 'right', i, stop)):
+                if first == last:
+                    continue
+                if child is None:
+                    attach.append((current, side, first, last))
                 else:
-                    parent.left = target.right
-                    target.right.prev = parent
-            else:
-                parent.left = target.right
-                target.right.prev = parent
-        #if target has two children
+                    stack.append((child, first, last))
+        for parent, side, start, stop in attach:
+            setattr(parent, side, BST._build(values, start, stop, parent))
+        self._filter_all(values)
+        #every node comes after its ancestors in visited
+        for n in reversed(visited):
+            self._fix(n)
+
+    def _filter_all(self, values):
+        """Add newly inserted values to the filter, if there is one."""
+        if self.filter is not None:
+            for x in values:
+                self.filter.add(x)
+
+    def _fix(self, n):
+        """Restore the stored height and size of n after insert_many()
+        changed the subtrees below it.
+        """
+        BST._update(n)
+
+    def union(self, other):
+        """Return a new tree of the same class with the values in either
+        tree. The two sorted sequences are merged and the result is built
+        with from_sorted(), so this takes O(n + m) and leaves both trees
+        unchanged.
+        """
+        def merged():
+            last = missing = object()
+            for x in heapq.merge(self, other):
+                if last is missing or last < x:
+                    yield x
+                    last = x
+        return type(self).from_sorted(merged())
+
+    # Magic, value type ('i' for int64, 'f' for float64, 's' for str), and
+    # number of values. The values follow in preorder.
+    _DUMP_HEADER = struct.Struct('<8scQ')
+    _DUMP_MAGIC = b'BSTDUMP1'
+
+    def _preorder(self):
+        """Iterate over the values in the tree in preorder, with a stack."""
+        stack = [] if self.root is None else [self.root]
+        while stack:
+            current = stack.pop()
+            yield current.value
+            if current.right is not None:
+                stack.append(current.right)
+            if current.left is not None:
+                stack.append(current.left)
+
+    def dump(self, fp):
+        """Write the values of the tree to the binary file fp as one flat
+        array in preorder, which is enough for load() to rebuild exactly the
+        same shape. ints and floats are stored as 8 bytes each and strs as a
+        4-byte length followed by their UTF-8 bytes.
+
+        Raises:
+            TypeError: if the values are not all ints, all floats, or all
+                strs.
+            ValueError: if an int does not fit in 8 bytes.
+        """
+        values = list(self._preorder())
+        kinds = {type(x) for x in values}
+        if len(kinds) > 1 or not kinds <= {int, float, str}:
+            raise TypeError('Only trees of all int, all float, or all str '
+                            'values can be dumped')
+        kind = {int: b'i', float: b'f', str: b's'}[kinds.pop()] \
+            if values else b'i'
+        fp.write(BST._DUMP_HEADER.pack(BST._DUMP_MAGIC, kind, len(values)))
+        if kind == b's':
+            parts = []
+            for x in values:
+                data = x.encode('utf-8')
+                parts.append(struct.pack('<I', len(data)))
+                parts.append(data)
+            fp.write(b''.join(parts))
         else:
-            swap_node = target.left
-            #find the left-right most node
-            while swap_node.right is not None:
-                swap_node = swap_node.right
-            swap_node_val = swap_node.value
-            #swap the nodes
-            swap_node.value = target_val
-            target.value = swap_node_val
-            #remove the new target node if the predecessor is a leaf
-            if swap_node.left is None:
-                if swap_node.prev.left is not None:
-                    if swap_node.prev.left.value == target_val:
-                        swap_node.prev.left = None
-                    else:
-                        swap_node.prev.right = None
-                else:
-                    swap_node.prev.right = None
-            #remove the new target node if the predecessor has a left child
+            try:
+                fp.write(struct.pack('<%d%s' % (len(values), 'q' if kind ==
+                                     b'i' else 'd'), *values))
+            except struct.error:
+                raise ValueError('Only ints that fit in 8 bytes can be dumped')
+
+    @staticmethod
+    def _read_dump(source):
+        """Return the list of values in a dump. The source can be any buffer,
+        such as bytes or an mmap of the file, which is read in place from its
+        start without moving its position, or else a binary file, which is
+        read from its current position to the end.
+        """
+        try:
+            buf = memoryview(source)
+        except TypeError:
+            buf = memoryview(source.read())
+        #release the view on return, so an mmap source can still be closed
+        with buf:
+            if len(buf) < BST._DUMP_HEADER.size:
+                raise ValueError('Not a tree dump')
+            magic, kind, n = BST._DUMP_HEADER.unpack_from(buf)
+            if magic != BST._DUMP_MAGIC or kind not in (b'i', b'f', b's'):
+                raise ValueError('Not a tree dump')
+            offset = BST._DUMP_HEADER.size
+            try:
+                if kind != b's':
+                    return list(struct.unpack_from(
+                        '<%d%s' % (n, 'q' if kind == b'i' else 'd'),
+                        buf, offset))
+                values = []
+                for _ in range(n):
+                    (length,) = struct.unpack_from('<I', buf, offset)
+                    offset += 4
+                    if offset + length > len(buf):
+                        raise ValueError('Tree dump is truncated')
+                    values.append(str(buf[offset:offset + length], 'utf-8'))
+                    offset += length
+            except struct.error:
+                raise ValueError('Tree dump is truncated')
+            return values
+
+    @classmethod
+    def load(cls, source):
+        """Rebuild a tree written by dump() from a buffer, such as bytes or an
+        mmap of the file, or from a binary file. A buffer is read in place
+        from its start, so the same mapping can be loaded again; a file is
+        read from its current position. Each value is attached below the last
+        stacked node it fits under, then the heights and sizes are filled in
+        from the bottom up, so this takes O(n) without recursion or
+        rebalancing.
+
+        Raises:
+            ValueError: if the source is not a valid dump.
+        """
+        nodes, stack, low = [], [], None
+        for x in BST._read_dump(source):
+            #every value must lie above the last node it went right of
+            if low is not None and not low < x:
+                raise ValueError('Tree dump is not in preorder')
+            n = BSTNode(x)
+            parent = None
+            while stack and stack[-1].value < x:
+                parent = stack.pop()
+            if stack and not x < stack[-1].value:
+                raise ValueError('Tree dump is not in preorder')
+            if parent is not None:          # Right child of the last pop.
+                parent.right = n
+                n.prev = parent
+                low = parent.value
+            elif stack:                     # Left child of the last node.
+                stack[-1].left = n
+                n.prev = stack[-1]
+            stack.append(n)
+            nodes.append(n)
+        #a node comes after its ancestors in preorder
+        for n in reversed(nodes):
+            BST._update(n)
+        tree = cls()
+        tree.root = nodes[0] if nodes else None
+        return tree
+
+    def __iter__(self):
+        """Iterate over the values in the tree in increasing order. Steps from
+        node to node with the parent references, so no stack is needed.
+        """
+        return self.irange()
+
+    def __reversed__(self):
+        """Iterate over the values in the tree in decreasing order."""
+        current = self.root
+        if current is None:
+            return
+        while current.right is not None:
+            current = current.right
+        while current is not None:
+            yield current.value
+            current = BST._adjacent(current, 'left', 'right')
+
+    def irange(self, low=None, high=None):
+        """Iterate lazily over the values in the tree between low and high,
+        including the endpoints, in increasing order. A bound of None leaves
+        that side of the range open.
+
+        Example:
+            >>> tree = BST.from_sorted([1, 3, 4, 5, 6, 7, 8])
+            >>> list(tree.irange(2, 6))
+            [3, 4, 5, 6]
+        """
+        #find the first node that is not below the range
+        current, start = self.root, None
+        while current is not None:
+            if low is not None and current.value < low:
+                current = current.right
             else:
-                if swap_node.prev.left is not None:
-                    if swap_node.prev.left.value == target_val:
-                        swap_node.prev.left = swap_node.left
-                    else:
-                        swap_node.prev.right = swap_node.left
-                else:
-                    swap_node.prev.right = swap_node.left
+                start, current = current, current.left
+        #step through the successors until the range is passed
+        while start is not None:
+            if high is not None and high < start.value:
+                return
+            yield start.value
+            start = BST._adjacent(start, 'right', 'left')
+
+    @staticmethod
+    def _adjacent(n, forward, backward):
+        """Return the in-order successor of n when forward is 'right', or its
+        predecessor when forward is 'left'. Return None if there is none.
+        """
+        child = getattr(n, forward)
+        if child is not None:
+            #the nearest node in that direction is deepest in the subtree
+            while getattr(child, backward) is not None:
+                child = getattr(child, backward)
+            return child
+        #otherwise climb until we leave a subtree on its backward side
+        while n.prev is not None and getattr(n.prev, forward) is n:
+            n = n.prev
+        return n.prev
 
     def __str__(self):
         """String representation: a hierarchical view of the BST.
@@ -327,9 +769,9 @@ class BST:
         # Build the directed graph.
         G = nx.DiGraph()
         G.add_node(self.root.value)
-        nodes = [self.root]
+        nodes = deque([self.root])
         while nodes:
-            current = nodes.pop(0)
+            current = nodes.popleft()
             for child in [current.left, current.right]:
                 if child is not None:
                     G.add_edge(current.value, child.value)
@@ -343,29 +785,186 @@ class BST:
 
 class AVL(BST):
     """Adelson-Velsky Landis binary search tree data structure class.
-    Rebalances after insertion when needed.
+    Rebalances after insertion and removal when needed.
     """
-    def insert(self, data):
-        """Insert a node containing the data into the tree, then rebalance."""
-        BST.insert(self, data)      # Insert the data like usual.
-        n = self.find(data)
-        while n:                    # Rebalance from the bottom up.
+    def _retrace(self, n):
+        """Walk from n up to the root after an insertion or removal below n,
+        updating heights and sizes and rebalancing from the bottom up.
+        """
+        while n:
             n = self._rebalance(n).prev
 
-    def remove(*args, **kwargs):
-        """Disable remove() to keep the tree in balance."""
-        raise NotImplementedError("remove() is disabled for this class")
+    def split(self, data):
+        """Split the tree into two AVL trees: one with the values less than
+        the data, and one with the values greater than or equal to it. The
+        nodes are moved into the new trees, leaving this tree empty.
+
+        The path to the data is cut off and its pieces are joined back
+        together from the bottom up; the join costs telescope, so the whole
+        split takes O(log n).
+
+        Example:
+            >>> tree = AVL.from_sorted([1, 3, 4, 5, 6, 7, 8])
+            >>> low, high = tree.split(5)
+            >>> list(low), list(high)
+            ([1, 3, 4], [5, 6, 7, 8])
+        """
+        #cut the path to the data into nodes and the subtrees they keep
+        path, current = [], self.root
+        while current is not None:
+            goes_right = not current.value < data
+            kept = current.right if goes_right else current.left
+            path.append((current, goes_right, kept))
+            current = current.left if goes_right else current.right
+        for node, _, kept in path:
+            node.prev = node.left = node.right = None
+            if kept is not None:
+                kept.prev = None
+        self.root = None
+        #join the pieces from the bottom up
+        low, high = None, None
+        for node, goes_right, kept in reversed(path):
+            if goes_right:
+                high = self._join(high, node, kept)
+            else:
+                low = self._join(kept, node, low)
+        return self._wrap(low), self._wrap(high)
+
+    @classmethod
+    def join(cls, left, right):
+        """Return a tree with the values of two AVL trees, where every value
+        in left is less than every value in right. The nodes are moved into
+        the new tree, leaving both trees empty. This takes O(log n).
+
+        Raises:
+            ValueError: if some value in left is not less than every value
+                in right.
+        """
+        result = cls()
+        if left.root is None or right.root is None:
+            result.root = left.root if right.root is None else right.root
+            left.root = right.root = None
+            return result
+        #the smallest node of right becomes the node between the two trees
+        middle = right.root
+        while middle.left is not None:
+            middle = middle.left
+        largest = left.root
+        while largest.right is not None:
+            largest = largest.right
+        if not largest.value < middle.value:
+            raise ValueError('Values in left must be less than values in right')
+        right.remove(middle.value)
+        middle.prev = middle.left = middle.right = None
+        result.root = result._join(left.root, middle, right.root)
+        left.root = right.root = None
+        return result
+
+    def _wrap(self, root):
+        """Return a new tree of the same class with the detached root."""
+        tree = type(self)()
+        tree.root = root
+        return tree
+
+    @classmethod
+    def load(cls, source):
+        """Rebuild a tree written by dump() (see BST.load()). A dump of an AVL
+        tree comes back in exactly the same, balanced shape. A dump of some
+        other tree is rebuilt from its sorted values instead, in O(n).
+
+        Raises:
+            ValueError: if the source is not a valid dump.
+        """
+        tree = BST.load.__func__(cls, source)
+        #check the balance of every node with a stack
+        stack = [] if tree.root is None else [tree.root]
+        while stack:
+            n = stack.pop()
+            if abs(AVL._balance_factor(n)) > 1:
+                return cls.from_sorted(tree)
+            stack.extend(child for child in (n.left, n.right)
+                         if child is not None)
+        return tree
+
+    def _fix(self, n):
+        """Rebalance n after insert_many() changed the subtrees below it,
+        which are already balanced. Rotations handle a height difference of
+        two; anything larger is repaired by joining the two subtrees at n.
+        """
+        if abs(AVL._height(n.right) - AVL._height(n.left)) <= 2:
+            self._rebalance(n)
+            return
+        parent, left, right = n.prev, n.left, n.right
+        side = None if parent is None else (
+            'left' if parent.left is n else 'right')
+        #detach n and its subtrees so the join stays inside them
+        for child in (left, right):
+            if child is not None:
+                child.prev = None
+        n.prev = n.left = n.right = None
+        if parent is None:
+            self.root = None
+        top = self._join(left, n, right)
+        top.prev = parent
+        if parent is None:
+            self.root = top
+        else:
+            setattr(parent, side, top)
+
+    def _join(self, left, n, right):
+        """Join two detached AVL subtrees with the detached node n between
+        them and return the root of the result. Every value in left must be
+        less than n.value, which must be less than every value in right.
+
+        The node goes down the spine of the taller subtree until it meets a
+        subtree about as tall as the shorter one, then the path is rebalanced
+        on the way back up, so this takes O(|height(left) - height(right)|).
+        """
+        hl, hr = AVL._height(left), AVL._height(right)
+        if hl > hr + 1:
+            #find the spot on the right spine of left where right fits
+            current = left
+            while AVL._height(current) > hr + 1:
+                parent, current = current, current.right
+            side = 'right'
+            lower, upper = current, right
+        elif hr > hl + 1:
+            #find the spot on the left spine of right where left fits
+            current = right
+            while AVL._height(current) > hl + 1:
+                parent, current = current, current.left
+            side = 'left'
+            lower, upper = left, current
+        else:
+            parent, side, lower, upper = None, None, left, right
+        n.left, n.right, n.prev = lower, upper, parent
+        for child in (lower, upper):
+            if child is not None:
+                child.prev = n
+        BST._update(n)
+        if parent is None:
+            return n
+        setattr(parent, side, n)
+        #rebalance back up to the top of the taller subtree
+        current = parent
+        while current is not None:
+            top = self._rebalance(current)
+            current = top.prev
+        return top
 
     def _rebalance(self,n):
-        """Rebalance the subtree starting at the specified node."""
+        """Rebalance the subtree starting at the specified node. The heights
+        and sizes of the node's children must already be correct.
+        """
+        BST._update(n)
         balance = AVL._balance_factor(n)
         if balance == -2:                                   # Left heavy
-            if AVL._height(n.left.left) > AVL._height(n.left.right):
+            if AVL._height(n.left.left) >= AVL._height(n.left.right):
                 n = self._rotate_left_left(n)                   # Left Left
             else:
                 n = self._rotate_left_right(n)                  # Left Right
         elif balance == 2:                                  # Right heavy
-            if AVL._height(n.right.right) > AVL._height(n.right.left):
+            if AVL._height(n.right.right) >= AVL._height(n.right.left):
                 n = self._rotate_right_right(n)                 # Right Right
             else:
                 n = self._rotate_right_left(n)                  # Right Left
@@ -373,9 +972,9 @@ class AVL(BST):
 
     @staticmethod
     def _height(current):
-        """Calculate the height of a given node by descending recursively until
-        there are no further child nodes. Return the number of children in the
-        longest chain down.
+        """Return the height of a given node, the number of children in the
+        longest chain down. Heights are stored on the nodes and updated as the
+        tree changes, so this takes constant time.
                                     node | height
         Example:  (c)                  a | 0
                   / \                  b | 1
@@ -385,9 +984,9 @@ class AVL(BST):
                     \                  f | 2
                     (e)                g | 0
         """
-        if current is None:     # Base case: the end of a branch.
-            return -1           # Otherwise, descend down both branches.
-        return 1 + max(AVL._height(current.right), AVL._height(current.left))
+        if current is None:     # The end of a branch.
+            return -1
+        return current.height
 
     @staticmethod
     def _balance_factor(n):
@@ -408,6 +1007,8 @@ class AVL(BST):
                 temp.prev.right = temp
         if n is self.root:
             self.root = temp
+        BST._update(n)
+        BST._update(temp)
         return temp
 
     def _rotate_right_right(self, n):
@@ -425,6 +1026,8 @@ class AVL(BST):
                 temp.prev.right = temp
         if n is self.root:
             self.root = temp
+        BST._update(n)
+        BST._update(temp)
         return temp
 
     def _rotate_left_right(self, n):
@@ -437,6 +1040,7 @@ class AVL(BST):
         temp2.left = temp1
         temp1.prev = temp2
         n.left = temp2
+        BST._update(temp1)
         return self._rotate_left_left(n)
 
     def _rotate_right_left(self, n):
@@ -449,74 +1053,1535 @@ class AVL(BST):
         temp2.right = temp1
         temp1.prev = temp2
         n.right = temp2
+        BST._update(temp1)
         return self._rotate_right_right(n)
 
 
-def prob4():
+class PersistentAVLNode:
+    """An immutable node for persistent AVL trees. A node is never modified
+    after it is built, so one node can be shared by many versions of a tree.
+    There is no parent reference, since a shared node has many parents.
+    """
+    __slots__ = ('value', 'left', 'right', 'height', 'size')
+
+    def __init__(self, data, left=None, right=None):
+        """Construct a node and compute its height and subtree size from its
+        children.
+        """
+        self.value, self.left, self.right = data, left, right
+        self.height = 1 + max(-1 if left is None else left.height,
+                              -1 if right is None else right.height)
+        self.size = (1 + (0 if left is None else left.size)
+                       + (0 if right is None else right.size))
+
+
+class PersistentAVL(BST):
+    """Copy-on-write AVL tree. insert() and remove() copy the O(log n) nodes
+    on the path to the change and then swap in the new root, so every older
+    root remains a complete, unchanging version of the tree.
+
+    Readers can share a tree with a writer without locking: find(), rank(),
+    select(), and count_range() read the root once and never see a partial
+    update. A reader that needs several calls to agree should work on a
+    snapshot(). Writers are serialized with an internal lock.
+    """
+    def __init__(self):
+        """Initialize the root attribute and the writer lock."""
+        BST.__init__(self)
+        self._lock = threading.Lock()
+
+    def snapshot(self):
+        """Return a tree holding the current version. Later changes to this
+        tree do not affect the snapshot, and vice versa.
+        """
+        tree = type(self)()
+        tree.root = self.root
+        return tree
+
+    @classmethod
+    def from_sorted(cls, iterable):
+        """Build a perfectly balanced tree from data that is already in
+        strictly increasing order in a single O(n) pass.
+
+        Raises:
+            ValueError: if the data is not strictly increasing.
+        """
+        values = list(iterable)
+        for i in range(1, len(values)):
+            if not values[i-1] < values[i]:
+                raise ValueError('Data must be strictly increasing')
+        def _build(start, stop):
+            """Build a balanced subtree from values[start:stop]."""
+            if start >= stop:
+                return None
+            mid = (start + stop) // 2
+            return PersistentAVLNode(values[mid], _build(start, mid),
+                                     _build(mid + 1, stop))
+        tree = cls()
+        tree.root = _build(0, len(values))
+        return tree
+
+    @classmethod
+    def load(cls, source):
+        """Rebuild a tree written by dump() from a binary file or a buffer.
+        Shared nodes are built from the bottom up, so the values are sorted
+        and passed to from_sorted().
+        """
+        return cls.from_iterable(BST._read_dump(source))
+
+    def insert(self, data):
+        """Insert the data by building a new version of the tree.
+
+        Raises:
+            ValueError: if the data is already in the tree.
+        """
+        with self._lock:
+            root = PersistentAVL._insert(self.root, data)
+            if self.filter is not None:
+                self.filter.add(data)
+            self.root = root
+
+    def remove(self, data):
+        """Remove the data by building a new version of the tree.
+
+        Raises:
+            ValueError: if there is no node containing the data, including if
+                the tree is empty.
+        """
+        with self._lock:
+            self.root = PersistentAVL._remove(self.root, data)
+            if self.filter is not None:
+                self.filter.remove(data)
+
+    def insert_many(self, iterable):
+        """Insert all of the data as a single new version of the tree, so
+        readers see either none or all of the batch.
+
+        Raises:
+            ValueError: if some data is already in the tree, or appears in
+                the batch more than once. Nothing is inserted in that case.
+        """
+        values = sorted(iterable)
+        with self._lock:
+            root = self.root
+            for data in values:
+                root = PersistentAVL._insert(root, data)
+            self._filter_all(values)
+            self.root = root
+
+    @staticmethod
+    def _insert(n, data):
+        """Return a copy of the subtree rooted at n with the data added."""
+        if n is None:
+            return PersistentAVLNode(data)
+        if data < n.value:
+            return PersistentAVL._balance(
+                n.value, PersistentAVL._insert(n.left, data), n.right)
+        if n.value < data:
+            return PersistentAVL._balance(
+                n.value, n.left, PersistentAVL._insert(n.right, data))
+        raise ValueError('Node already in BST')
+
+    @staticmethod
+    def _remove(n, data):
+        """Return a copy of the subtree rooted at n with the data removed."""
+        if n is None:
+            raise ValueError(str(data) + " is not in the tree.")
+        if data < n.value:
+            return PersistentAVL._balance(
+                n.value, PersistentAVL._remove(n.left, data), n.right)
+        if n.value < data:
+            return PersistentAVL._balance(
+                n.value, n.left, PersistentAVL._remove(n.right, data))
+        #found it: splice it out, or replace it with its in-order predecessor
+        if n.left is None:
+            return n.right
+        if n.right is None:
+            return n.left
+        predecessor = n.left
+        while predecessor.right is not None:
+            predecessor = predecessor.right
+        return PersistentAVL._balance(
+            predecessor.value,
+            PersistentAVL._remove(n.left, predecessor.value), n.right)
+
+    @staticmethod
+    def _balance(data, left, right):
+        """Return a new node with the data and the given subtrees, rotating
+        if the subtree heights differ by two.
+        """
+        height = AVL._height
+        node = PersistentAVLNode
+        if height(left) > height(right) + 1:                # Left heavy
+            if height(left.left) >= height(left.right):         # Left Left
+                return node(left.value, left.left,
+                            node(data, left.right, right))
+            middle = left.right                                 # Left Right
+            return node(middle.value, node(left.value, left.left, middle.left),
+                        node(data, middle.right, right))
+        if height(right) > height(left) + 1:                # Right heavy
+            if height(right.right) >= height(right.left):       # Right Right
+                return node(right.value, node(data, left, right.left),
+                            right.right)
+            middle = right.left                                 # Right Left
+            return node(middle.value, node(data, left, middle.left),
+                        node(right.value, middle.right, right.right))
+        return node(data, left, right)
+
+    def __iter__(self):
+        """Iterate over the values of the current version in increasing
+        order, using a stack of O(log n) nodes instead of parent references.
+        """
+        return self.irange()
+
+    def __reversed__(self):
+        """Iterate over the values of the current version in decreasing
+        order.
+        """
+        stack, current = [], self.root
+        while stack or current is not None:
+            if current is not None:
+                stack.append(current)
+                current = current.right
+            else:
+                current = stack.pop()
+                yield current.value
+                current = current.left
+
+    def irange(self, low=None, high=None):
+        """Iterate lazily over the values of the current version between low
+        and high, including the endpoints. A bound of None leaves that side of
+        the range open.
+        """
+        #stack the nodes on the path to low that are not below the range
+        stack, current = [], self.root
+        while current is not None:
+            if low is not None and current.value < low:
+                current = current.right
+            else:
+                stack.append(current)
+                current = current.left
+        while stack:
+            current = stack.pop()
+            if high is not None and high < current.value:
+                return
+            yield current.value
+            current = current.right
+            while current is not None:
+                stack.append(current)
+                current = current.left
+
+
+
+class ScapegoatNode(BSTNode):
+    """A node class for scapegoat trees. A removed node stays in the tree as
+    a tombstone until its subtree is rebuilt, so the size attribute counts
+    only the live nodes in the subtree and total counts all of them.
+    """
+    __slots__ = ('deleted', 'total')
+
+    def __init__(self, data):
+        BSTNode.__init__(self, data)
+        self.deleted = False    # True once the value has been removed.
+        self.total = 1          # Number of nodes in the subtree, tombstones too.
+
+
+class ScapegoatTree(BST):
+    """Scapegoat tree: a binary search tree kept balanced by occasionally
+    rebuilding a subtree instead of rotating on every change, which gives
+    amortized O(log n) updates.
+
+    insert() rebuilds the lowest ancestor that is out of weight balance
+    whenever a new node lands deeper than log(n) base 1/alpha. remove() only
+    marks the node as a tombstone, and rebuilds the highest subtree that the
+    removal leaves with more tombstones than live nodes.
+
+    Attributes:
+        root (ScapegoatNode): the first node in the tree.
+        alpha (float): the weight balance, between 1/2 and 1. Smaller values
+            keep the tree shallower at the cost of more rebuilds.
+        dead (int): the number of tombstones in the tree.
+    """
+    def __init__(self, alpha=2/3):
+        """Initialize an empty tree.
+
+        Raises:
+            ValueError: if alpha is not strictly between 1/2 and 1.
+        """
+        if not .5 < alpha < 1:
+            raise ValueError('alpha must be between 1/2 and 1')
+        BST.__init__(self)
+        self.alpha = alpha
+        self.dead = 0
+
+    @classmethod
+    def from_sorted(cls, iterable):
+        """Build a perfectly balanced tree from data that is already in
+        strictly increasing order in a single O(n) pass.
+
+        Raises:
+            ValueError: if the data is not strictly increasing.
+        """
+        values = list(iterable)
+        for i in range(1, len(values)):
+            if not values[i-1] < values[i]:
+                raise ValueError('Data must be strictly increasing')
+        tree = cls()
+        nodes = [ScapegoatNode(x) for x in values]
+        tree.root = ScapegoatTree._relink(nodes, 0, len(nodes), None)
+        return tree
+
+    @classmethod
+    def load(cls, source):
+        """Rebuild a tree written by dump() from a binary file or a buffer,
+        as a perfectly balanced tree of the values.
+        """
+        return cls.from_iterable(BST._read_dump(source))
+
+    def _preorder(self):
+        """Iterate over the live values in the tree in preorder."""
+        stack = [] if self.root is None else [self.root]
+        while stack:
+            current = stack.pop()
+            if not current.deleted:
+                yield current.value
+            if current.right is not None:
+                stack.append(current.right)
+            if current.left is not None:
+                stack.append(current.left)
+
+    @staticmethod
+    def _relink(nodes, start, stop, parent):
+        """Link the nodes in nodes[start:stop], which are in increasing
+        order, into a balanced subtree under the parent and return its root.
+        """
+        if start >= stop:
+            return None
+        mid = (start + stop) // 2
+        n = nodes[mid]
+        n.prev = parent
+        n.left = ScapegoatTree._relink(nodes, start, mid, n)
+        n.right = ScapegoatTree._relink(nodes, mid + 1, stop, n)
+        ScapegoatTree._update(n)
+        return n
+
+    @staticmethod
+    def _update(n):
+        """Recompute the stored height, live size, and total size of n from
+        its children.
+        """
+        BST._update(n)
+        left, right = n.left, n.right
+        n.total = (1 + (0 if left is None else left.total)
+                     + (0 if right is None else right.total))
+        if n.deleted:
+            n.size -= 1
+
+    def _retrace(self, n):
+        """Walk from n up to the root, updating the stored sizes."""
+        while n is not None:
+            ScapegoatTree._update(n)
+            n = n.prev
+
+    def get(self, data, default=None):
+        """Return the node containing the data, or default if there is no
+        such node or it is a tombstone.
+        """
+        node = BST.get(self, data)
+        if node is None or node.deleted:
+            return default
+        return node
+
+    def find_many(self, iterable):
+        """Return a list of the nodes containing each of the data, in the
+        same order (see BST.find_many()).
+
+        Raises:
+            ValueError: if some data is not in the tree.
+        """
+        result = BST.find_many(self, iterable)
+        for node in result:
+            if node.deleted:
+                raise ValueError(str(node.value) + " is not in the tree.")
+        return result
+
+    def insert(self, data):
+        """Insert a new node containing the data, or bring back its
+        tombstone, then rebuild the scapegoat subtree if the node is too deep.
+
+        Raises:
+            ValueError: if the data is already in the tree.
+        """
+        if self.root is None:
+            self.root = ScapegoatNode(data)
+            if self.filter is not None:
+                self.filter.add(data)
+            return
+        current, depth = self.root, 1
+        #loop through the tree until you reach the end of a branch
+        while True:
+            if data == current.value:
+                if not current.deleted:
+                    raise ValueError('Node already in BST')
+                current.deleted = False
+                self.dead -= 1
+                if self.filter is not None:
+                    self.filter.add(data)
+                self._retrace(current)
+                return
+            side = 'left' if data < current.value else 'right'
+            if getattr(current, side) is None:
+                break
+            current = getattr(current, side)
+            depth += 1
+        new_node = ScapegoatNode(data)
+        new_node.prev = current
+        setattr(current, side, new_node)
+        if self.filter is not None:
+            self.filter.add(data)
+        self._retrace(current)
+        #find the lowest ancestor whose child is too heavy and rebuild it
+        if depth > math.log(self.root.total, 1 / self.alpha):
+            child, n = new_node, current
+            while n.prev is not None and child.total <= self.alpha * n.total:
+                child, n = n, n.prev
+            self._rebuild(n)
+
+    def insert_many(self, iterable):
+        """Insert all of the data, in sorted order. Nothing is inserted if
+        any data is a duplicate.
+
+        Raises:
+            ValueError: if some data is already in the tree, or appears in
+                the batch more than once.
+        """
+        values = sorted(iterable)
+        for i, data in enumerate(values):
+            if (i > 0 and not values[i-1] < data) or data in self:
+                raise ValueError('Node already in BST')
+        for data in values:
+            self.insert(data)
+
+    def remove(self, data):
+        """Mark the node containing the data as a tombstone. If that leaves
+        a subtree with more tombstones than live nodes, rebuild the highest
+        such subtree without them.
+
+        Raises:
+            ValueError: if there is no node containing the data, including if
+                the tree is empty.
+        """
+        node = self.find(data)
+        node.deleted = True
+        self.dead += 1
+        if self.filter is not None:
+            self.filter.remove(data)
+        self._retrace(node)
+        target, n = None, node
+        while n is not None:
+            if 2 * n.size < n.total:
+                target = n
+            n = n.prev
+        if target is not None:
+            self._rebuild(target)
+
+    def _rebuild(self, n):
+        """Rebuild the subtree rooted at n into a perfectly balanced one,
+        dropping its tombstones. The nodes are reused, not copied.
+        """
+        parent = n.prev
+        side = None if parent is None else (
+            'left' if parent.left is n else 'right')
+        #collect the live nodes in order with an explicit stack
+        nodes, stack, current = [], [], n
+        while stack or current is not None:
+            if current is not None:
+                stack.append(current)
+                current = current.left
+            else:
+                current = stack.pop()
+                if not current.deleted:
+                    nodes.append(current)
+                current = current.right
+        self.dead -= n.total - n.size
+        top = ScapegoatTree._relink(nodes, 0, len(nodes), parent)
+        if parent is None:
+            self.root = top
+        else:
+            setattr(parent, side, top)
+        self._retrace(parent)
+
+    def __reversed__(self):
+        """Iterate over the live values in the tree in decreasing order."""
+        current = self.root
+        if current is None:
+            return
+        while current.right is not None:
+            current = current.right
+        while current is not None:
+            if not current.deleted:
+                yield current.value
+            current = BST._adjacent(current, 'left', 'right')
+
+    def irange(self, low=None, high=None):
+        """Iterate lazily over the live values in the tree between low and
+        high, including the endpoints (see BST.irange()).
+        """
+        current, start = self.root, None
+        while current is not None:
+            if low is not None and current.value < low:
+                current = current.right
+            else:
+                start, current = current, current.left
+        while start is not None:
+            if high is not None and high < start.value:
+                return
+            if not start.deleted:
+                yield start.value
+            start = BST._adjacent(start, 'right', 'left')
+
+    def __str__(self):
+        """String representation: the live values of the tree printed by
+        depth levels (see BST.__str__()). Levels holding only tombstones are
+        printed as empty lists.
+        """
+        if self.root is None:
+            return "[]"
+        out, current_level = [], [self.root]
+        while current_level:
+            out.append([n.value for n in current_level if not n.deleted])
+            current_level = [child for n in current_level
+                             for child in (n.left, n.right)
+                             if child is not None]
+        return "\n".join([str(x) for x in out])
+
+
+
+class BTreeNode:
+    """A node class for B-trees. Contains a sorted list of values and, unless
+    the node is a leaf, a list of len(values) + 1 child nodes. Every value in
+    children[i] lies between values[i-1] and values[i].
+    """
+    __slots__ = ('values', 'children')
+
+    def __init__(self, values=None, children=None):
+        self.values = [] if values is None else values
+        self.children = [] if children is None else children
+
+
+class BTree:
+    """B-tree data structure class with the same find(), insert(), remove(),
+    and __str__() contract as BST. Each node stores a sorted block of values
+    that is searched with bisection, so the tree is only O(log_t n) levels
+    deep and a lookup touches a handful of nodes instead of one per level.
+
+    Every node other than the root holds between order-1 and 2*order-1
+    values, where order is the minimum degree of the tree.
+
+    Attributes:
+        root (BTreeNode): the top node of the tree, or None if it is empty.
+        order (int): the minimum degree of the tree.
+    """
+    def __init__(self, order=32):
+        """Initialize an empty tree of the given minimum degree.
+
+        Raises:
+            ValueError: if order is less than 2.
+        """
+        if order < 2:
+            raise ValueError('B-tree order must be at least 2')
+        self.root = None
+        self.order = order
+        self.length = 0
+
+    def __len__(self):
+        """Return the number of values in the tree."""
+        return self.length
+
+    def get(self, data, default=None):
+        """Return the node containing the data, or default if there is no
+        such node. Never raises, so a miss costs no exception.
+        """
+        current = self.root
+        while current is not None:
+            i = bisect_left(current.values, data)
+            if i < len(current.values) and current.values[i] == data:
+                return current
+            current = current.children[i] if current.children else None
+        return default
+
+    def __contains__(self, data):
+        """Return True if the data is in the tree."""
+        return self.get(data) is not None
+
+    def find(self, data):
+        """Return the node containing the data. If there is no such node
+        in the tree, including if the tree is empty, raise a ValueError.
+        """
+        node = self.get(data)
+        if node is None:
+            raise ValueError(str(data) + " is not in the tree.")
+        return node
+
+    def insert(self, data):
+        """Insert the data into the tree. Full nodes are split on the way
+        down, so the insertion finishes in a single pass.
+
+        Raises:
+            ValueError: if the data is already in the tree.
+
+        Example:
+            >>> tree = BTree(order=2)
+            >>> for i in [4, 3, 6, 5, 7, 8, 1]:
+            ...     tree.insert(i)
+            ...
+            >>> print(tree)
+            [[4, 6]]
+            [[1, 3], [5], [7, 8]]
+        """
+        if self.root is None:
+            self.root = BTreeNode([data])
+            self.length += 1
+            return
+        #grow the tree upward if the root is full
+        if len(self.root.values) == 2*self.order - 1:
+            self.root = BTreeNode(children=[self.root])
+            self._split_child(self.root, 0)
+        current = self.root
+        while True:
+            i = bisect_left(current.values, data)
+            if i < len(current.values) and current.values[i] == data:
+                raise ValueError('Node already in BTree')
+            if not current.children:
+                current.values.insert(i, data)
+                self.length += 1
+                return
+            #make room in the child before stepping into it
+            if len(current.children[i].values) == 2*self.order - 1:
+                self._split_child(current, i)
+                if current.values[i] == data:
+                    raise ValueError('Node already in BTree')
+                if current.values[i] < data:
+                    i += 1
+            current = current.children[i]
+
+    def remove(self, data):
+        """Remove the data from the tree. Nodes on the way down are topped up
+        to at least order values first, so no node underflows.
+
+        Raises:
+            ValueError: if the data is not in the tree, including if the tree
+                is empty.
+        """
+        if self.root is None:
+            raise ValueError(str(data) + " is not in the tree.")
+        t = self.order
+        current = self.root
+        try:
+            while True:
+                i = bisect_left(current.values, data)
+                found = i < len(current.values) and current.values[i] == data
+                #base case: delete straight out of a leaf
+                if not current.children:
+                    if not found:
+                        raise ValueError(str(data) + " is not in the tree.")
+                    del current.values[i]
+                    self.length -= 1
+                    return
+                if found:
+                    left, right = current.children[i], current.children[i+1]
+                    if len(left.values) >= t:
+                        #replace the data with its predecessor and remove that
+                        data = BTree._last(left)
+                        current.values[i] = data
+                        current = left
+                    elif len(right.values) >= t:
+                        #replace the data with its successor and remove that
+                        data = BTree._first(right)
+                        current.values[i] = data
+                        current = right
+                    else:
+                        #both sides are minimal, so pull the data down
+                        self._merge_children(current, i)
+                        current = left
+                    continue
+                #make sure the child we step into can lose a value
+                child = current.children[i]
+                if len(child.values) == t - 1:
+                    if i > 0 and len(current.children[i-1].values) >= t:
+                        BTree._rotate_from_left(current, i)
+                    elif (i < len(current.values)
+                            and len(current.children[i+1].values) >= t):
+                        BTree._rotate_from_right(current, i)
+                    elif i < len(current.values):
+                        self._merge_children(current, i)
+                    else:
+                        self._merge_children(current, i - 1)
+                        child = current.children[i-1]
+                current = child
+        finally:
+            #shrink the tree if the root was emptied by a merge or removal
+            if not self.root.values:
+                self.root = self.root.children[0] if self.root.children else None
+
+    def _split_child(self, parent, i):
+        """Split the full child parent.children[i] around its middle value,
+        which moves up into the parent.
+        """
+        t = self.order
+        child = parent.children[i]
+        sibling = BTreeNode(child.values[t:], child.children[t:])
+        parent.values.insert(i, child.values[t-1])
+        parent.children.insert(i + 1, sibling)
+        del child.values[t-1:]
+        del child.children[t:]
+
+    @staticmethod
+    def _merge_children(parent, i):
+        """Merge parent.children[i+1] and the i-th value of the parent into
+        parent.children[i].
+        """
+        left, right = parent.children[i], parent.children.pop(i + 1)
+        left.values.append(parent.values.pop(i))
+        left.values.extend(right.values)
+        left.children.extend(right.children)
+
+    @staticmethod
+    def _rotate_from_left(parent, i):
+        """Move a value from the left sibling of parent.children[i] through
+        the parent into the child.
+        """
+        child, sibling = parent.children[i], parent.children[i-1]
+        child.values.insert(0, parent.values[i-1])
+        parent.values[i-1] = sibling.values.pop()
+        if sibling.children:
+            child.children.insert(0, sibling.children.pop())
+
+    @staticmethod
+    def _rotate_from_right(parent, i):
+        """Move a value from the right sibling of parent.children[i] through
+        the parent into the child.
+        """
+        child, sibling = parent.children[i], parent.children[i+1]
+        child.values.append(parent.values[i])
+        parent.values[i] = sibling.values.pop(0)
+        if sibling.children:
+            child.children.append(sibling.children.pop(0))
+
+    @staticmethod
+    def _first(n):
+        """Return the smallest value in the subtree rooted at n."""
+        while n.children:
+            n = n.children[0]
+        return n.values[0]
+
+    @staticmethod
+    def _last(n):
+        """Return the largest value in the subtree rooted at n."""
+        while n.children:
+            n = n.children[-1]
+        return n.values[-1]
+
+    def __iter__(self):
+        """Iterate over the values in the tree in increasing order."""
+        if self.root is None:
+            return
+        #each stack entry is a node and the index of its next value
+        stack = [(self.root, 0)]
+        while stack:
+            node, i = stack.pop()
+            if node.children:
+                if i < len(node.values) + 1:
+                    stack.append((node, i + 1))
+                    if i > 0:
+                        yield node.values[i-1]
+                    stack.append((node.children[i], 0))
+            else:
+                yield from node.values
+
+    def __str__(self):
+        """String representation: the value blocks of the tree printed by
+        depth levels, in the same layout as BST.__str__().
+
+        Example:      [4, 6]           '[[4, 6]]
+                    /   |    \\          [[1, 3], [5], [7, 8]]'
+                [1, 3] [5] [7, 8]
+        """
+        if self.root is None:                       # Empty tree
+            return "[]"
+        out, current_level = [], [self.root]        # Nonempty tree
+        while current_level:
+            out.append([node.values for node in current_level])
+            current_level = [child for node in current_level
+                             for child in node.children]
+        return "\n".join([str(x) for x in out])
+
+
+class DiskBPlusTree:
+    """Persistent B+ tree of str or int values stored as fixed-size pages in
+    a file and accessed through mmap. Opening an existing index only maps the
+    file, so a process can start using it without rebuilding anything.
+
+    Page 0 holds the file header. Every other page is a leaf, which holds a
+    sorted block of values and the page number of the next leaf, or an
+    internal node, which holds separator values and child page numbers.
+    Values are stored as fixed-width keys, so str values must fit in
+    key_size bytes once encoded as UTF-8 and must not contain '\\x00'.
+
+    Attributes:
+        filename (str): the file backing the tree.
+        page_size (int): the number of bytes in each page.
+        key_size (int): the number of bytes used to store each value.
+    """
+    # Magic, page size, key size, key type, root, page count, and length.
+    _HEADER = struct.Struct('<8sIIcIIQ')
+    # Page type, number of keys, and next leaf (leaves only).
+    _NODE = struct.Struct('<BHI')
+    _MAGIC = b'BPTREE01'
+    _LEAF, _INTERNAL = 0, 1
+
+    def __init__(self, filename, key_size=32, page_size=4096, key_type=str):
+        """Open the index stored in filename, or create an empty one if the
+        file does not exist. The sizes and key type of an existing index are
+        read from its header and the arguments are ignored.
+
+        Raises:
+            ValueError: if the file is not a B+ tree index, if key_type is not
+                str or int, or if a page cannot hold at least 3 values.
+        """
+        self.filename = filename
+        if not os.path.exists(filename):
+            DiskBPlusTree._create(filename, key_size, page_size, key_type)
+        self._file = open(filename, 'r+b')
+        header = self._file.read(DiskBPlusTree._HEADER.size)
+        if len(header) < DiskBPlusTree._HEADER.size:
+            self._file.close()
+            raise ValueError(filename + ' is not a B+ tree index')
+        (magic, self.page_size, self.key_size, kind,
+         self._root, self._pages, self._length) = \
+            DiskBPlusTree._HEADER.unpack(header)
+        if magic != DiskBPlusTree._MAGIC:
+            self._file.close()
+            raise ValueError(filename + ' is not a B+ tree index')
+        self._ints = kind == b'i'
+        self._leaf_cap, self._inner_cap = DiskBPlusTree._capacities(
+            self.page_size, self.key_size)
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+
+    @staticmethod
+    def _capacities(page_size, key_size):
+        """Return the maximum number of values in a leaf and in an internal
+        page of the given sizes.
+        """
+        room = page_size - DiskBPlusTree._NODE.size
+        return room // key_size, (room - 4) // (key_size + 4)
+
+    @staticmethod
+    def _create(filename, key_size, page_size, key_type):
+        """Write the header page of a new, empty index."""
+        if key_type is int:
+            key_size = 8
+        elif key_type is not str:
+            raise ValueError('key_type must be str or int')
+        if min(DiskBPlusTree._capacities(page_size, key_size)) < 3:
+            raise ValueError('Pages must hold at least 3 values')
+        header = DiskBPlusTree._HEADER.pack(
+            DiskBPlusTree._MAGIC, page_size, key_size,
+            b'i' if key_type is int else b's', 0, 1, 0)
+        with open(filename, 'wb') as outfile:
+            outfile.write(header.ljust(page_size, b'\x00'))
+
+    @classmethod
+    def bulk_load(cls, filename, iterable, key_size=32, page_size=4096,
+                  key_type=str):
+        """Build a new index in filename from data in strictly increasing
+        order, replacing any existing file. The leaves are written in one
+        sequential pass and the internal levels are built on top of them, so
+        only one value per leaf is kept in memory. The index is built in a
+        temporary file next to filename and moved over it only once complete,
+        so a failed build leaves any existing index untouched. A new file gets
+        the same permissions as one made by the constructor, and a replaced
+        file keeps its own.
+
+        Raises:
+            ValueError: if the data is not strictly increasing or a value
+                does not fit in key_size bytes.
+        """
+        #create the temporary file as open() would, so that the umask sets
+        #its mode, instead of tempfile's fixed 0600
+        while True:
+            temp = '%s.%08x.tmp' % (filename, random.getrandbits(32))
+            try:
+                os.close(os.open(temp, os.O_CREAT | os.O_EXCL | os.O_WRONLY,
+                                 0o666))
+                break
+            except FileExistsError:
+                pass
+        tree = None
+        try:
+            cls._create(temp, key_size, page_size, key_type)
+            tree = cls(temp)
+            node, ps = DiskBPlusTree._NODE, tree.page_size
+            #each entry is the smallest key under a page and the page number
+            level, keys, last, length = [], [], None, 0
+            with open(temp, 'r+b') as outfile:
+                outfile.seek(ps)
+                for data in iterable:
+                    key = tree._encode(data)
+                    if last is not None and not last < key:
+                        raise ValueError('Data must be strictly increasing')
+                    last = key
+                    length += 1
+                    #the current leaf is full, so it has a successor
+                    if len(keys) == tree._leaf_cap:
+                        level.append((keys[0], tree._pages))
+                        tree._pages += 1
+                        outfile.write(tree._pack(cls._LEAF, keys, tree._pages))
+                        keys = []
+                    keys.append(key)
+                if keys:
+                    level.append((keys[0], tree._pages))
+                    tree._pages += 1
+                    outfile.write(tree._pack(cls._LEAF, keys, 0))
+                #group each level under a new level of internal pages
+                while len(level) > 1:
+                    groups = [level[i:i + tree._inner_cap + 1]
+                              for i in range(0, len(level), tree._inner_cap + 1)]
+                    if len(groups) > 1 and len(groups[-1]) == 1:
+                        groups[-1].insert(0, groups[-2].pop())
+                    level = []
+                    for group in groups:
+                        level.append((group[0][0], tree._pages))
+                        tree._pages += 1
+                        outfile.write(tree._pack(
+                            cls._INTERNAL, [k for k, _ in group[1:]],
+                            [p for _, p in group]))
+            tree._root = level[0][1] if level else 0
+            tree._length = length
+            tree._remap()
+            tree._write_header()
+            tree.close()
+            #an index that is being replaced keeps its permissions
+            if os.path.exists(filename):
+                os.chmod(temp, os.stat(filename).st_mode & 0o7777)
+            os.replace(temp, filename)
+        finally:
+            #close the handles and drop the temporary file on any error
+            if tree is not None:
+                tree.close()
+            if os.path.exists(temp):
+                os.remove(temp)
+        return cls(filename)
+
+    def close(self):
+        """Flush the index to disk and close the file."""
+        if self._mm is not None:
+            self._mm.flush()
+            self._mm.close()
+            self._file.close()
+            self._mm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        """Return the number of values in the index."""
+        return self._length
+
+    def _encode(self, data):
+        """Return the fixed-width key that stores the data. The keys compare
+        as bytes in the same order as the data.
+
+        Raises:
+            ValueError: if the data does not fit in a key.
+        """
+        if self._ints:
+            if not -2**63 <= data < 2**63:
+                raise ValueError(str(data) + ' does not fit in 8 bytes')
+            return (data + 2**63).to_bytes(8, 'big')
+        key = data.encode('utf-8')
+        if len(key) > self.key_size or b'\x00' in key:
+            raise ValueError(repr(data) + ' does not fit in a key')
+        return key.ljust(self.key_size, b'\x00')
+
+    def _bound(self, data, low):
+        """Return the key for a range bound and whether a value stored under
+        exactly that key lies inside the range. A bound does not have to be
+        storable: an int bound past the 8-byte range is clamped to its end, a
+        float bound is rounded inward, and a str bound too long for a key is
+        cut to key_size bytes. A stored value equal to a cut bound is
+        shorter than it, so it is inside the range only for a high bound.
+        """
+        if self._ints:
+            if data < -2**63:
+                return bytes(8), low
+            if data >= 2**63:
+                return b'\xff'*8, not low
+            data = math.ceil(data) if low else math.floor(data)
+            return (data + 2**63).to_bytes(8, 'big'), True
+        key = data.encode('utf-8')
+        if len(key) > self.key_size:
+            return key[:self.key_size], not low
+        return key.ljust(self.key_size, b'\x00'), True
+
+    def _decode(self, key):
+        """Return the data stored in a key."""
+        if self._ints:
+            return int.from_bytes(key, 'big') - 2**63
+        return key.rstrip(b'\x00').decode('utf-8')
+
+    def _pack(self, kind, keys, link):
+        """Return the bytes of a page. For a leaf, link is the next leaf's
+        page number; for an internal page, it is the list of children.
+        """
+        if kind == DiskBPlusTree._LEAF:
+            body = b''.join(keys)
+            head = DiskBPlusTree._NODE.pack(kind, len(keys), link)
+        else:
+            children = link + [0]*(self._inner_cap + 1 - len(link))
+            body = struct.pack('<%dI' % len(children), *children)
+            body += b''.join(keys)
+            head = DiskBPlusTree._NODE.pack(kind, len(keys), 0)
+        return (head + body).ljust(self.page_size, b'\x00')
+
+    def _read(self, page):
+        """Return the type, keys, and link of a page (see _pack())."""
+        mm, ks = self._mm, self.key_size
+        start = page*self.page_size
+        kind, count, link = DiskBPlusTree._NODE.unpack_from(mm, start)
+        start += DiskBPlusTree._NODE.size
+        if kind == DiskBPlusTree._INTERNAL:
+            link = list(struct.unpack_from('<%dI' % (count + 1), mm, start))
+            start += 4*(self._inner_cap + 1)
+        keys = [mm[start + i*ks:start + (i+1)*ks] for i in range(count)]
+        return kind, keys, link
+
+    def _write(self, page, kind, keys, link):
+        """Overwrite a page in place."""
+        start = page*self.page_size
+        self._mm[start:start + self.page_size] = self._pack(kind, keys, link)
+
+    def _allocate(self):
+        """Return the number of a new page at the end of the file, growing
+        the file (by doubling) when it is full.
+        """
+        page = self._pages
+        self._pages += 1
+        if self._pages*self.page_size > len(self._mm):
+            self._mm.flush()
+            self._file.truncate(2*self._pages*self.page_size)
+            self._remap()
+        return page
+
+    def _remap(self):
+        """Map the whole file again after it changed size."""
+        self._mm.close()
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+
+    def _write_header(self):
+        DiskBPlusTree._HEADER.pack_into(
+            self._mm, 0, DiskBPlusTree._MAGIC, self.page_size, self.key_size,
+            b'i' if self._ints else b's', self._root, self._pages,
+            self._length)
+
+    def _key_offset(self, page):
+        """Return the position in the file of the first key of a page."""
+        start = page*self.page_size
+        if self._mm[start] == DiskBPlusTree._INTERNAL:
+            return start + DiskBPlusTree._NODE.size + 4*(self._inner_cap + 1)
+        return start + DiskBPlusTree._NODE.size
+
+    def _bisect(self, page, count, key, right):
+        """Binary search the keys of a page in place, without copying the
+        whole page. Return the bisect_right() index if right is True and the
+        bisect_left() index otherwise.
+        """
+        mm, ks = self._mm, self.key_size
+        start = self._key_offset(page)
+        low, high = 0, count
+        while low < high:
+            mid = (low + high) // 2
+            probe = mm[start + mid*ks:start + (mid+1)*ks]
+            if probe < key or (right and probe == key):
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def _find_leaf(self, key):
+        """Return the page number of the leaf where the key belongs."""
+        page, node = self._root, DiskBPlusTree._NODE
+        while True:
+            kind, count, _ = node.unpack_from(self._mm, page*self.page_size)
+            if kind == DiskBPlusTree._LEAF:
+                return page
+            i = self._bisect(page, count, key, True)
+            page = struct.unpack_from(
+                '<I', self._mm, page*self.page_size + node.size + 4*i)[0]
+
+    def __contains__(self, data):
+        """Return True if the data is in the index, with one descent from
+        the root.
+        """
+        if not isinstance(data, int if self._ints else str):
+            return False
+        try:
+            key = self._encode(data)
+        except ValueError:
+            return False
+        if not self._root:
+            return False
+        page = self._find_leaf(key)
+        count = DiskBPlusTree._NODE.unpack_from(
+            self._mm, page*self.page_size)[1]
+        i = self._bisect(page, count, key, False)
+        start = self._key_offset(page) + i*self.key_size
+        return i < count and self._mm[start:start + self.key_size] == key
+
+    def find(self, data):
+        """Return the data if it is in the index. Otherwise, including if the
+        index is empty, raise a ValueError.
+        """
+        if data not in self:
+            raise ValueError(str(data) + " is not in the tree.")
+        return data
+
+    def insert(self, data):
+        """Insert the data into the index, splitting full pages on the way
+        back up.
+
+        Raises:
+            ValueError: if the data is already in the index or does not fit
+                in a key.
+        """
+        key = self._encode(data)
+        if not self._root:
+            self._root = self._allocate()
+            self._write(self._root, DiskBPlusTree._LEAF, [key], 0)
+        else:
+            split = self._insert_below(self._root, key)
+            #grow the tree upward if the root was split
+            if split is not None:
+                separator, sibling = split
+                root = self._allocate()
+                self._write(root, DiskBPlusTree._INTERNAL, [separator],
+                            [self._root, sibling])
+                self._root = root
+        self._length += 1
+        self._write_header()
+
+    def _insert_below(self, page, key):
+        """Insert the key into the subtree under the page. If the page had to
+        be split, return the separator key and the page number of the new
+        right sibling; otherwise return None.
+        """
+        mm, ks, node = self._mm, self.key_size, DiskBPlusTree._NODE
+        kind, count, link = node.unpack_from(mm, page*self.page_size)
+        if kind == DiskBPlusTree._LEAF:
+            i = self._bisect(page, count, key, False)
+            start = self._key_offset(page) + i*ks
+            if i < count and mm[start:start + ks] == key:
+                raise ValueError('Node already in DiskBPlusTree')
+            if count < self._leaf_cap:
+                #shift the larger keys over by one slot in place
+                end = start + (count - i)*ks
+                mm[start + ks:end + ks] = mm[start:end]
+                mm[start:start + ks] = key
+                node.pack_into(mm, page*self.page_size, kind, count + 1, link)
+                return None
+            #split the full leaf and thread the new page into the leaf chain
+            keys = self._read(page)[1]
+            keys.insert(i, key)
+            mid = len(keys) // 2
+            sibling = self._allocate()
+            self._write(sibling, kind, keys[mid:], link)
+            self._write(page, kind, keys[:mid], sibling)
+            return keys[mid], sibling
+        i = self._bisect(page, count, key, True)
+        child = struct.unpack_from(
+            '<I', mm, page*self.page_size + node.size + 4*i)[0]
+        split = self._insert_below(child, key)
+        if split is None:
+            return None
+        kind, keys, link = self._read(page)
+        keys.insert(i, split[0])
+        link.insert(i + 1, split[1])
+        if len(keys) <= self._inner_cap:
+            self._write(page, kind, keys, link)
+            return None
+        #split the internal page, moving the middle key up
+        mid = len(keys) // 2
+        sibling = self._allocate()
+        self._write(sibling, kind, keys[mid+1:], link[mid+1:])
+        self._write(page, kind, keys[:mid], link[:mid+1])
+        return keys[mid], sibling
+
+    def __iter__(self):
+        """Iterate over the values in the index in increasing order."""
+        return self.irange()
+
+    def irange(self, low=None, high=None):
+        """Iterate lazily over the values in the index between low and high,
+        including the endpoints, by walking the chain of leaves. A bound of
+        None leaves that side of the range open, and a bound that could not
+        be stored, such as a str longer than a key, is clamped (see _bound()).
+        """
+        if not self._root:
+            return
+        if low is None:
+            page = self._find_leaf(b'')
+            start = 0
+        else:
+            key, inclusive = self._bound(low, True)
+            page = self._find_leaf(key)
+            count = DiskBPlusTree._NODE.unpack_from(
+                self._mm, page*self.page_size)[1]
+            start = self._bisect(page, count, key, not inclusive)
+        stop, closed = (None, True) if high is None else self._bound(high, False)
+        while page:
+            _, keys, page = self._read(page)
+            for key in keys[start:]:
+                if stop is not None and (stop < key
+                                         or (not closed and stop == key)):
+                    return
+                yield self._decode(key)
+            start = 0
+
+
+class RadixTrieNode:
+    """A node class for radix tries. The label is the piece of the key on the
+    edge into this node, and children maps the first character of each
+    child's label to that child.
+    """
+    __slots__ = ('label', 'children', 'terminal')
+
+    def __init__(self, label, terminal=False):
+        self.label = label
+        self.children = {}
+        self.terminal = terminal    # True if a key ends at this node.
+
+
+class RadixTrie:
+    """Compressed trie of strings. Each edge is labelled with a whole run of
+    characters instead of one, so a chain of single-child nodes is stored as
+    a single node. A lookup compares each character of the key once, so it
+    costs O(len(key)) no matter how many keys are stored.
+
+    Attributes:
+        root (RadixTrieNode): the node for the empty prefix.
+    """
+    def __init__(self):
+        """Initialize an empty trie."""
+        self.root = RadixTrieNode('')
+        self.length = 0
+
+    def __len__(self):
+        """Return the number of keys in the trie."""
+        return self.length
+
+    def _path(self, key):
+        """Return the list of nodes from the root to the node where the key
+        ends, or None if no node ends exactly at the key.
+        """
+        path, i = [self.root], 0
+        while i < len(key):
+            child = path[-1].children.get(key[i])
+            if child is None or not key.startswith(child.label, i):
+                return None
+            path.append(child)
+            i += len(child.label)
+        return path
+
+    def __contains__(self, key):
+        """Return True if the key is in the trie, following its edges from
+        the root.
+        """
+        path = self._path(key)
+        return path is not None and path[-1].terminal
+
+    def find(self, key):
+        """Return the node where the key ends. If the key is not in the trie,
+        raise a ValueError.
+        """
+        path = self._path(key)
+        if path is None or not path[-1].terminal:
+            raise ValueError(repr(key) + " is not in the trie.")
+        return path[-1]
+
+    def insert(self, key):
+        """Insert the key, splitting an edge if the key leaves it partway.
+
+        Raises:
+            ValueError: if the key is already in the trie.
+
+        Example:
+            >>> trie = RadixTrie()
+            >>> for word in ['car', 'cart', 'cat', 'dog']:
+            ...     trie.insert(word)
+            ...
+            >>> print(trie)
+            ['']
+            ['ca', 'dog']
+            ['r', 't']
+            ['t']
+        """
+        node, i = self.root, 0
+        while i < len(key):
+            child = node.children.get(key[i])
+            if child is None:
+                node.children[key[i]] = RadixTrieNode(key[i:], True)
+                self.length += 1
+                return
+            #measure how much of the edge label the key follows
+            label, common = child.label, 1
+            while (common < len(label) and i + common < len(key)
+                    and label[common] == key[i + common]):
+                common += 1
+            if common < len(label):
+                #the key leaves the edge partway, so split it there
+                middle = RadixTrieNode(label[:common])
+                child.label = label[common:]
+                middle.children[child.label[0]] = child
+                node.children[key[i]] = middle
+                child = middle
+            node, i = child, i + common
+        if node.terminal:
+            raise ValueError('Key already in RadixTrie')
+        node.terminal = True
+        self.length += 1
+
+    def remove(self, key):
+        """Remove the key, merging any node left with a single child into it.
+
+        Raises:
+            ValueError: if the key is not in the trie.
+        """
+        path = self._path(key)
+        if path is None or not path[-1].terminal:
+            raise ValueError(repr(key) + " is not in the trie.")
+        node = path[-1]
+        node.terminal = False
+        self.length -= 1
+        if node is self.root:
+            return
+        parent = path[-2]
+        if not node.children:
+            del parent.children[node.label[0]]
+            #the parent may now be a pass-through node
+            if parent is not self.root and not parent.terminal:
+                node = parent
+                parent = path[-3]
+        if node is not self.root and not node.terminal \
+                and len(node.children) == 1:
+            (child,) = node.children.values()
+            child.label = node.label + child.label
+            parent.children[child.label[0]] = child
+
+    def starts_with(self, prefix):
+        """Iterate lazily over the keys that begin with the prefix, in
+        increasing order.
+        """
+        #find the node whose path spells the prefix or first runs past it
+        node, word = self.root, ''
+        while len(word) < len(prefix):
+            child = node.children.get(prefix[len(word)])
+            if child is None:
+                return
+            rest = prefix[len(word):]
+            if not (rest.startswith(child.label) or
+                    child.label.startswith(rest)):
+                return
+            node, word = child, word + child.label
+        #walk the subtree depth first, smallest labels first
+        stack = [(node, word)]
+        while stack:
+            node, word = stack.pop()
+            if node.terminal:
+                yield word
+            for first in sorted(node.children, reverse=True):
+                child = node.children[first]
+                stack.append((child, word + child.label))
+
+    def __iter__(self):
+        """Iterate over the keys in the trie in increasing order."""
+        return self.starts_with('')
+
+    def longest_prefix(self, text):
+        """Return the longest key in the trie that is a prefix of the text.
+
+        Raises:
+            ValueError: if no key is a prefix of the text.
+        """
+        node, i, best = self.root, 0, None
+        while True:
+            if node.terminal:
+                best = i
+            if i == len(text):
+                break
+            child = node.children.get(text[i])
+            if child is None or not text.startswith(child.label, i):
+                break
+            node, i = child, i + len(child.label)
+        if best is None:
+            raise ValueError("No key is a prefix of " + repr(text))
+        return text[:best]
+
+    def __str__(self):
+        """String representation: the edge labels of the trie printed by
+        depth levels, in the same layout as BST.__str__().
+        """
+        out, current_level = [], [self.root]
+        while current_level:
+            out.append(sorted(node.label for node in current_level))
+            current_level = [child for node in current_level
+                             for child in node.children.values()]
+        return "\n".join([str(x) for x in out])
+
+
+
+def _build_linked_list(data):
+    S = SinglyLinkedList()
+    for x in data:
+        S.append(x)
+    return S
+
+
+def _build_tree(cls):
+    def build(data):
+        T = cls()
+        for x in data:
+            T.insert(x)
+        return T
+    return build
+
+
+def _find_sorted(L, x):
+    i = bisect_left(L, x)
+    if i == len(L) or L[i] != x:
+        raise ValueError(str(x) + " is not in the list")
+    return i
+
+
+# Name: (build the structure from a list, search the structure for a value).
+BENCHMARKS = {
+    'SinglyLinkedList': (_build_linked_list,
+                         SinglyLinkedList.iterative_find),
+    'BST': (_build_tree(BST), BST.find),
+    'AVL': (_build_tree(AVL), AVL.find),
+    'BTree': (_build_tree(BTree), BTree.find),
+    'dict': (dict.fromkeys, dict.__getitem__),
+    'sorted list': (sorted, _find_sorted),
+}
+
+
+def _summarize(times):
+    """Return the min, median, 90th percentile, and max of the times."""
+    times = sorted(times)
+    def percentile(p):
+        return times[min(len(times) - 1, int(p * len(times)))]
+    return {'min': times[0], 'median': statistics.median(times),
+            'p90': percentile(.9), 'max': times[-1]}
+
+
+def benchmark(sizes=(10**3, 10**4, 10**5, 10**6), structures=None, data=None,
+              queries=1000, repeat=5, warmup=1, max_sizes=None,
+              outfile=None):
+    """Time building each structure and searching it for random values that
+    it contains, for each number of values n in sizes.
+
+    Each measurement is taken warmup times and thrown away, then repeat more
+    times. The build time is the time to add all n values; the find time is
+    the average time of one search. Peak memory is measured with tracemalloc
+    during one extra, untimed build.
+
+    Parameters:
+        sizes: the numbers of values to build each structure with.
+        structures: names of entries in BENCHMARKS. Defaults to all of them.
+        data: a list of distinct values to sample from, such as the words in
+            english.txt. Defaults to random integers.
+        queries (int): the number of values to search for each repetition.
+        repeat (int): the number of timed repetitions.
+        warmup (int): the number of untimed repetitions.
+        max_sizes (dict): the largest n to run for some structures.
+            Defaults to {'SinglyLinkedList': 10**4} since its search is O(n).
+        outfile (str): if given, write the results to this file as JSON.
+
+    Returns:
+        (dict): the settings and a list of results, one for each structure
+            and size, with 'build' and 'find' time summaries in seconds
+            (see _summarize()) and 'peak_bytes'.
+    """
+    if structures is None:
+        structures = list(BENCHMARKS)
+    if max_sizes is None:
+        max_sizes = {'SinglyLinkedList': 10**4}
+    results = []
+    for n in sizes:
+        if data is None:
+            values = random.sample(range(10*n), n)
+        else:
+            values = random.sample(data, n)
+        targets = [random.choice(values) for _ in range(queries)]
+        for name in structures:
+            if n > max_sizes.get(name, n):
+                continue
+            build, find = BENCHMARKS[name]
+            build_times, find_times = [], []
+            for i in range(warmup + repeat):
+                start = time.perf_counter()
+                S = build(values)
+                built = time.perf_counter()
+                for x in targets:
+                    find(S, x)
+                end = time.perf_counter()
+                if i >= warmup:
+                    build_times.append(built - start)
+                    find_times.append((end - built) / queries)
+                del S
+            #measure memory separately since tracing slows everything down
+            tracemalloc.start()
+            S = build(values)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            del S
+            results.append({'structure': name, 'n': n,
+                            'build': _summarize(build_times),
+                            'find': _summarize(find_times),
+                            'peak_bytes': peak})
+    report = {'python': sys.version, 'queries': queries, 'repeat': repeat,
+              'warmup': warmup, 'results': results}
+    if outfile is not None:
+        with open(outfile, 'w') as file:
+            json.dump(report, file, indent=2)
+    return report
+
+
+def prob4(sizes=tuple(2**i for i in range(3, 11)), filename='english.txt',
+          structures=('SinglyLinkedList', 'BST', 'AVL'), **kwargs):
     """Compare the build and search times of the SinglyLinkedList, BST, and
-    AVL classes. For search times, use SinglyLinkedList.iterative_find(),
-    BST.find(), and AVL.find() to search for 5 random elements in each
-    structure. Plot the number of elements in the structure versus the build
-    and search times. Use log scales where appropriate.
+    AVL classes on random words from the file. For search times, use
+    SinglyLinkedList.iterative_find(), BST.find(), and AVL.find() to search
+    for 5 random elements in each structure. Plot the number of elements in
+    the structure versus the median build and search times on log scales.
+
+    Other keyword arguments are passed on to benchmark().
     """
-    with open('english.txt','r') as file:
-        w = file.readlines()
-    n_val = [2**i for i in range(3,11)]
-    T1 = []
-    T2 = []
-    T3 = []
-    T4 = []
-    T5 = []
-    T6 = []
-    for n in n_val:
-        samp = random.sample(w,n)
-
-        start1 = time.perf_counter()
-        S = SinglyLinkedList()
-        for j in range(n):
-            S.append(samp[j])
-        end1 = time.perf_counter() - start1
-        start2 = time.perf_counter()
-        B = BST()
-        for j in range(n):
-            B.insert(samp[j])
-        end2 = time.perf_counter() - start2
-        start3 = time.perf_counter()
-        A = AVL()
-        for j in range(n):
-            A.insert(samp[j])
-        end3 = time.perf_counter() - start3
-
-        T1.append(end1)
-        T2.append(end2)
-        T3.append(end3)
-
-        find_samp = random.sample(samp,5)
-        
-        start4 = time.perf_counter()
-        for k in range(5):
-            S.iterative_find(find_samp[k])
-        end4 = time.perf_counter() - start4
-        start5 = time.perf_counter()
-        for k in range(5):
-            B.find(find_samp[k])
-        end5 = time.perf_counter() - start5
-        start6 = time.perf_counter()
-        for k in range(5):
-            A.find(find_samp[k])
-        end6 = time.perf_counter() - start6
-
-        T4.append(end4)
-        T5.append(end5)
-        T6.append(end6)
-    D = [i for i in range(len(n_val))]
-    plt.subplot(121)
-    plt.loglog(D,T1)
-    plt.loglog(D,T2)
-    plt.loglog(D,T3)
-    plt.subplot(122)
-    plt.loglog(D,T4)
-    plt.loglog(D,T5)
-    plt.loglog(D,T6)
-    
+    with open(filename, 'r') as file:
+        words = sorted(set(file.read().split()))
+    kwargs.setdefault('queries', 5)
+    report = benchmark(sizes, structures, words, **kwargs)
+    for i, kind in enumerate(['build', 'find']):
+        plt.subplot(1, 2, i + 1)
+        for name in structures:
+            rows = [r for r in report['results'] if r['structure'] == name]
+            plt.loglog([r['n'] for r in rows],
+                       [r[kind]['median'] for r in rows],
+                       '.-', base=2, label=name)
+        plt.title(kind.capitalize() + ' times')
+        plt.xlabel('n')
+        plt.ylabel('seconds')
+        plt.legend()
     plt.show()
@@ -0,0 +1,78 @@
+# bloom_filter.py
+
+
+import math
+
+
+class CountingBloomFilter:
+    """A counting Bloom filter: a fixed-size table of small counters that
+    answers "is this value possibly present?" in O(1) without storing the
+    values. A value that was added is always reported as present. A value
+    that was not added is usually reported as absent, but may be reported
+    as present with probability about error_rate.
+
+    Each value bumps k counters, so values can also be removed again by
+    decrementing them. A counter that reaches 255 stays there, since it can
+    no longer be decremented safely.
+
+    Attributes:
+        size (int): the number of counters.
+        hashes (int): the number of counters touched by each value.
+    """
+    def __init__(self, capacity, error_rate=0.01):
+        """Size the table for the given number of values and false positive
+        rate. Storing more values than that still works, but raises the
+        false positive rate.
+
+        Raises:
+            ValueError: if capacity is not positive or error_rate is not
+                strictly between 0 and 1.
+        """
+        if capacity <= 0:
+            raise ValueError('capacity must be positive')
+        if not 0 < error_rate < 1:
+            raise ValueError('error_rate must be between 0 and 1')
+        self.size = max(1, math.ceil(-capacity * math.log(error_rate)
+                                     / math.log(2)**2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.counts = bytearray(self.size)
+
+    def _positions(self, data):
+        """Return the counters for the data, using double hashing to derive
+        every position from a single hash.
+        """
+        h = hash((data, 0x9e3779b9))
+        first, step = h & 0xffffffff, (h >> 32) | 1
+        return [(first + i*step) % self.size for i in range(self.hashes)]
+
+    def add(self, data):
+        """Record the data as present."""
+        counts = self.counts
+        for i in self._positions(data):
+            if counts[i] < 255:
+                counts[i] += 1
+
+    def remove(self, data):
+        """Forget one earlier add() of the data. Only remove data that was
+        added, or present values may start being reported as absent.
+        """
+        counts = self.counts
+        for i in self._positions(data):
+            if 0 < counts[i] < 255:
+                counts[i] -= 1
+
+    def clear(self):
+        """Forget every value."""
+        self.counts = bytearray(self.size)
+
+    def __contains__(self, data):
+        """Return False if the data is definitely absent, True if it may be
+        present. Most absent data is ruled out by the first counter checked.
+        """
+        h = hash((data, 0x9e3779b9))
+        first, step = h & 0xffffffff, (h >> 32) | 1
+        counts, size = self.counts, self.size
+        for i in range(self.hashes):
+            if not counts[(first + i*step) % size]:
+                return False
+        return True
@@ -2,7 +2,9 @@
 
 
 from collections import deque
+from itertools import chain
 import networkx as nx
+import numpy as np
 from matplotlib import pyplot as plt
 
 
@@ -118,18 +120,24 @@ class Graph:
                     Q.append(val)
         return order
 
-    def shortest_path(self, source, target):
+    def shortest_path(self, source, target, bidirectional=False):
         """Begin a BFS at the source node and proceed until the target is
         found. Return a list containing the nodes in the shortest path from
         the source to the target, including endoints.
 
+        Each node found records the node it was reached from, and the path
+        is rebuilt from these parents once, at the end. With bidirectional
+        set, searches from both ends take turns expanding whichever frontier
+        is smaller until they meet, which usually reaches far fewer nodes.
+
         Parameters:
             source: the node to start the search at.
             target: the node to search for.
+            bidirectional (bool): if True, also search back from the target.
 
         Returns:
             A list of nodes along the shortest path from source to target,
-                including the endpoints.
+                including the endpoints, or None if there is no path.
 
         Raises:
             KeyError: if the source or target nodes are not in the graph.
@@ -139,23 +147,224 @@ class Graph:
             raise KeyError('Source node not in graph')
         if target not in self.d:
             raise KeyError('Target node not in graph')
-        
+        if bidirectional:
+            return self._bidirectional_path(source, target)
+
         queue = deque()
-        marked = set()
-        queue.append((source,list(source)))
-        marked.add(source)
+        parent = {source: None}
+        queue.append(source)
         #loop through Q removing first element until empty
         while len(queue) != 0:
-            #if node is already in the order remove it
-            current,current_path = queue.popleft()
-            #
+            current = queue.popleft()
             if current == target:
-                return current_path
-            #
+                return self._path(parent, target)[::-1]
+            for val in self.d[current]:
+                if val not in parent:
+                    parent[val] = current
+                    queue.append(val)
+
+    @staticmethod
+    def _path(parent, node):
+        """Return the nodes from node back to the start of the search."""
+        path = []
+        while node is not None:
+            path.append(node)
+            node = parent[node]
+        return path
+
+    def _expand(self, frontier, parent, other):
+        """Visit the neighbors of every node in frontier, recording their
+        parents. Return the next frontier and None, or stop at the first
+        edge (u, v) from frontier into the other search's nodes and return
+        None and that edge.
+        """
+        next_frontier = []
+        for current in frontier:
             for val in self.d[current]:
-                if val not in marked:
-                    marked.add(val)
-                    queue.append((val,current_path + list(val)))
+                if val in other:
+                    return None, (current, val)
+                if val not in parent:
+                    parent[val] = current
+                    next_frontier.append(val)
+        return next_frontier, None
+
+    def _bidirectional_path(self, source, target):
+        """Search level by level from both ends, always expanding the smaller
+        frontier, and join the two parent chains at the first edge found
+        between the searches. Since every level is checked against all the
+        nodes the other search has found, that first edge lies on a shortest
+        path.
+        """
+        if source == target:
+            return [source]
+        forward, backward = {source: None}, {target: None}
+        forward_frontier, backward_frontier = [source], [target]
+        while forward_frontier and backward_frontier:
+            if len(forward_frontier) <= len(backward_frontier):
+                forward_frontier, edge = self._expand(forward_frontier,
+                                                        forward, backward)
+                if edge is not None:
+                    u, v = edge
+                    return self._path(forward, u)[::-1] + self._path(backward, v)
+            else:
+                backward_frontier, edge = self._expand(backward_frontier,
+                                                        backward, forward)
+                if edge is not None:
+                    v, u = edge
+                    return self._path(forward, u)[::-1] + self._path(backward, v)
+        return None
+
+class CSRGraph:
+    """A graph object, stored in compressed sparse row form. Nodes are
+    numbered 0 to n-1, the neighbors of node i are indices[indptr[i]:
+    indptr[i+1]], and labels maps the numbers back to the node labels. This
+    takes a few bytes per edge instead of a set entry, and lets a breadth
+    first search expand a whole frontier with array operations.
+
+    Attributes:
+        labels (list): the label of each node.
+        ids (dict): the number of each node label.
+        indptr ((n+1,) ndarray): where each node's neighbors start in indices.
+        indices ((2m,) ndarray): the neighbors of every node, node by node.
+    """
+    def __init__(self, labels, indptr, indices):
+        """Store the node labels and the CSR arrays as class attributes."""
+        self.labels = list(labels)
+        self.ids = {label: i for i, label in enumerate(self.labels)}
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices)
+
+    @staticmethod
+    def _dtype(n):
+        """Return the smallest signed integer type that can number n nodes."""
+        return np.int32 if n < 2**31 else np.int64
+
+    @classmethod
+    def from_graph(cls, graph):
+        """Build a CSRGraph with the same nodes and edges as a Graph. Each
+        node's neighbors keep the order of its set in graph.d, so traverse()
+        and shortest_path() give the same results as the Graph's.
+        """
+        labels = list(graph.d)
+        ids = {label: i for i, label in enumerate(labels)}
+        counts = np.fromiter((len(graph.d[label]) for label in labels),
+                                dtype=np.int64, count=len(labels))
+        indptr = np.zeros(len(labels) + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        indices = np.fromiter((ids[v] for v in chain.from_iterable(
+                                graph.d[label] for label in labels)),
+                                dtype=cls._dtype(len(labels)), count=indptr[-1])
+        return cls(labels, indptr, indices)
+
+    @classmethod
+    def from_edges(cls, edges, labels=None):
+        """Build a CSRGraph from a sequence of undirected (u, v) edges.
+        Repeated edges are stored once, and neighbors are sorted by number.
+
+        Parameters:
+            edges: (u, v) pairs of node labels, or if labels is given, an
+                (m, 2) array of node numbers, which is converted without a
+                Python loop.
+            labels: the label of each node, or None to number the nodes in
+                order of first appearance in edges.
+        """
+        if labels is None:
+            ids = {}
+            edges = np.array([[ids.setdefault(u, len(ids)),
+                                ids.setdefault(v, len(ids))] for u, v in edges],
+                                dtype=np.int64).reshape(-1, 2)
+            labels = list(ids)
+        else:
+            edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+        n = len(labels)
+        #store each edge both ways, then sort and dedupe by (source, target)
+        keys = np.concatenate((edges[:, 0]*n + edges[:, 1],
+                                edges[:, 1]*n + edges[:, 0]))
+        keys.sort()
+        if keys.size:
+            keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys // n, minlength=n), out=indptr[1:])
+        return cls(labels, indptr, (keys % n).astype(cls._dtype(n)))
+
+    def _search(self, source, target=None):
+        """Run a level-synchronous breadth-first search from node number
+        source, stopping after the level that reaches target, if given.
+
+        Each level gathers the neighbors of the whole frontier in frontier
+        order, drops visited nodes, and keeps the first occurrence of each
+        remaining node. That is the order in which a one-node-at-a-time
+        search would discover them, and the node that first lists each one
+        is its parent.
+
+        Returns:
+            (list): the frontier arrays, in order.
+            ((n,) ndarray): the parent number of each reached node, with -1
+                for unreached nodes and source as its own parent.
+        """
+        indptr, indices = self.indptr, self.indices
+        parent = np.full(len(self.labels), -1, dtype=np.int64)
+        #the earliest position at which each node appears in a level
+        claim = np.full(len(self.labels), np.iinfo(np.int64).max)
+        parent[source] = source
+        frontier = np.array([source], dtype=np.int64)
+        levels = []
+        while frontier.size:
+            levels.append(frontier)
+            if target is not None and parent[target] >= 0:
+                break
+            #gather every frontier node's neighbor slice in one index array
+            starts = indptr[frontier]
+            counts = indptr[frontier + 1] - starts
+            total = counts.sum()
+            offsets = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+            neighbors = indices[offsets + np.arange(total)]
+            owners = np.repeat(frontier, counts)
+            #keep unvisited neighbors, first occurrence only, in order
+            fresh = parent[neighbors] < 0
+            neighbors, owners = neighbors[fresh], owners[fresh]
+            position = np.arange(neighbors.size)
+            np.minimum.at(claim, neighbors, position)
+            first = position[claim[neighbors] == position]
+            claim[neighbors] = np.iinfo(np.int64).max
+            frontier = neighbors[first].astype(np.int64)
+            parent[frontier] = owners[first]
+        return levels, parent
+
+    def traverse(self, source):
+        """Traverse the graph with a breadth-first search until all nodes
+        reachable from source have been visited. Return the list of nodes
+        in the order that they were visited.
+
+        Raises:
+            KeyError: if the source node is not in the graph.
+        """
+        if source not in self.ids:
+            raise KeyError('Source node not in graph')
+        levels, parent = self._search(self.ids[source])
+        labels = self.labels
+        return [labels[i] for i in np.concatenate(levels).tolist()]
+
+    def shortest_path(self, source, target):
+        """Return a list of the nodes in a shortest path from the source to
+        the target, including endpoints, or None if there is no path.
+
+        Raises:
+            KeyError: if the source or target nodes are not in the graph.
+        """
+        if source not in self.ids:
+            raise KeyError('Source node not in graph')
+        if target not in self.ids:
+            raise KeyError('Target node not in graph')
+        s, t = self.ids[source], self.ids[target]
+        levels, parent = self._search(s, t)
+        if parent[t] < 0:
+            return None
+        #follow the parents back to the source
+        path = [t]
+        while path[-1] != s:
+            path.append(int(parent[path[-1]]))
+        return [self.labels[i] for i in reversed(path)]
 
 
 class MovieGraph:
@@ -1,6 +1,14 @@
 # linked_lists.py
 
 
+import asyncio
+from collections import deque
+import os
+import threading
+
+from bloom_filter import CountingBloomFilter
+
+
 class Node:
     """A basic node class for storing data."""
     def __init__(self, data):
@@ -43,6 +51,9 @@ class LinkedList:
         self.head = None
         self.tail = None
         self.length = 0
+        self.filter = None      # Optional CountingBloomFilter of the values.
+        self.finger = None      # (node, index) of the last node reached by get().
+        self.node_index = None  # Optional dict from each value to its nodes.
 
     def append(self, data):
         """Append a new node containing the data to the end of the list."""
@@ -61,6 +72,81 @@ class LinkedList:
             self.tail = new_node
         #create length function
         self.length += 1
+        if self.filter is not None:
+            self.filter.add(data)
+        if self.node_index is not None:
+            self._index(new_node)
+
+    def use_filter(self, capacity=None, error_rate=0.01):
+        """Keep a Bloom filter of the values in the list, so that searches
+        for values that are not in the list usually fail in O(1) without
+        walking it. The filter is sized for capacity values, which defaults
+        to twice the current length (and at least 1024).
+        """
+        if capacity is None:
+            capacity = max(1024, 2*len(self))
+        self.filter = CountingBloomFilter(capacity, error_rate)
+        node = self.head
+        while node is not None:
+            self.filter.add(node.value)
+            node = node.next
+
+    def use_index(self):
+        """Keep a dict from each value to the nodes holding it, in list
+        order, so that find() and remove() take O(1) instead of walking the
+        list. Costs one dict entry per distinct value.
+        """
+        self.node_index = {}
+        node = self.head
+        while node is not None:
+            self.node_index.setdefault(node.value, deque()).append(node)
+            node = node.next
+
+    def _index(self, node):
+        """Add a node that was just linked into the list to the index."""
+        nodes = self.node_index.get(node.value)
+        if nodes is None:
+            self.node_index[node.value] = deque([node])
+        elif node.next is None:
+            nodes.append(node)
+        elif node.prev is None:
+            nodes.appendleft(node)
+        else:
+            #find the closest earlier node with the same value
+            before = node.prev
+            while before is not None and before.value != node.value:
+                before = before.prev
+            if before is None:
+                nodes.appendleft(node)
+            else:
+                nodes.insert(nodes.index(before) + 1, node)
+
+    def _unindex(self, node):
+        """Drop a node that is being unlinked from the index."""
+        nodes = self.node_index[node.value]
+        if nodes[0] is node:
+            nodes.popleft()
+        elif nodes[-1] is node:
+            nodes.pop()
+        else:
+            nodes.remove(node)
+        if not nodes:
+            del self.node_index[node.value]
+
+    def __contains__(self, data):
+        """Return True if some node in the list contains the data. Never
+        raises, so a miss costs no exception.
+        """
+        if self.filter is not None and data not in self.filter:
+            return False
+        if self.node_index is not None:
+            return data in self.node_index
+        node = self.head
+        while node is not None:
+            if node.value == data:
+                return True
+            node = node.next
+        return False
 
     def find(self, data):
         """Return the first node in the list containing the data.
@@ -82,28 +168,26 @@ class LinkedList:
         #check if empty
         if self.head is None:
             raise ValueError('LinkedList is empty')
+        #the filter rules out most missing data without a scan
+        if self.filter is not None and data not in self.filter:
+            raise ValueError('Data is not in LinkedList')
+        #the index holds the nodes for each value in list order
+        if self.node_index is not None:
+            if data not in self.node_index:
+                raise ValueError('Data is not in LinkedList')
+            return self.node_index[data][0]
         node = self.head
-        search = LinkedListNode(data)
         #check each node in the list
-        while node is not search:
-            #if they are equal we're done
-            if node.value == search.value:
+        while node is not None:
+            if node.value == data:
                 return node
-            #check if it's at the end of the list
-            else:
-                if node.next.value == self.tail.value:
-                    if node.next.value is search.value:
-                        return node.next
-                    #error if it isn't in the list
-                    else:
-                        raise ValueError('Data is not in LinkedList')
-                #loop to the next node
-                else:
-                    node = node.next
-        return node
+            node = node.next
+        raise ValueError('Data is not in LinkedList')
 
     def get(self, i):
-        """Return the i-th node in the list.
+        """Return the i-th node in the list. The walk starts from whichever
+        of the head, the tail, or the last node returned by get() is nearest,
+        so scanning the list in order costs O(1) per call.
 
         Raises:
             IndexError: if i is negative or greater than or equal to the
@@ -123,10 +207,22 @@ class LinkedList:
         #check if index is in range
         if i < 0 or i >= len(self):
             raise IndexError('LinkedList index out of range')
-        node = self.head
-        #loop to the i-th entry and return it
-        for j in range(i):
+        #start from the nearest end
+        if i < len(self) - i:
+            node, j = self.head, 0
+        else:
+            node, j = self.tail, len(self) - 1
+        #or from the finger if that is nearer still
+        if self.finger is not None and abs(i - self.finger[1]) < abs(i - j):
+            node, j = self.finger
+        #walk to the i-th entry and return it
+        while j < i:
             node = node.next
+            j += 1
+        while j > i:
+            node = node.prev
+            j -= 1
+        self.finger = (node, i)
         return node
 
     def __len__(self):
@@ -188,6 +284,11 @@ class LinkedList:
         """
         #find target node
         target = self.find(data)
+        self.finger = None
+        if self.filter is not None:
+            self.filter.remove(target.value)
+        if self.node_index is not None:
+            self._unindex(target)
         #check if it is the first or last node in LinkedList
         if target.next is None:
             #check if it is the first and last
@@ -240,22 +341,149 @@ class LinkedList:
         #if inserting at end just append
         if index == len(self):
             self.append(data)
+            return
+        if self.filter is not None:
+            self.filter.add(data)
         #if beginning then change the head
-        elif index == 0:
+        if index == 0:
             self.length += 1
+            self.finger = None
             temphead = self.head
             self.head = new
             self.head.next = temphead
             temphead.prev = new
+            if self.node_index is not None:
+                self._index(new)
         #if the middle then change all prev and next
         else:
-            self.length += 1
             target = self.get(index)
+            self.length += 1
             new.prev = target.prev
             new.next = target
             target.prev.next = new
             target.prev = new
-        
+            #the new node now sits at index, and the old finger has shifted
+            self.finger = (new, index)
+            if self.node_index is not None:
+                self._index(new)
+
+    def _clear(self):
+        """Empty the list after its nodes have been moved elsewhere, keeping
+        the filter and index, if any, but emptied.
+        """
+        self.head = None
+        self.tail = None
+        self.length = 0
+        self.finger = None
+        if self.filter is not None:
+            self.filter.clear()
+        if self.node_index is not None:
+            self.node_index = {}
+
+    def extend_from(self, other):
+        """Move every node of other to the end of this list, leaving other
+        empty. Takes O(1) by relinking the nodes, plus a pass over the moved
+        nodes if this list keeps a filter or an index.
+
+        Raises:
+            ValueError: if other is this list.
+        """
+        if other is self:
+            raise ValueError('Cannot extend a LinkedList from itself')
+        if other.head is None:
+            return
+        if self.filter is not None or self.node_index is not None:
+            node = other.head
+            while node is not None:
+                if self.filter is not None:
+                    self.filter.add(node.value)
+                if self.node_index is not None:
+                    self.node_index.setdefault(node.value, deque()).append(node)
+                node = node.next
+        #link the tail to the other list's head
+        if self.tail is None:
+            self.head = other.head
+        else:
+            self.tail.next = other.head
+            other.head.prev = self.tail
+        self.tail = other.tail
+        self.length += other.length
+        other._clear()
+
+    def splice(self, node, other):
+        """Move every node of other into this list right after node, or at
+        the front if node is None, leaving other empty. Takes O(1) by
+        relinking the nodes, plus a pass over the moved nodes if this list
+        keeps a filter or an index. node must be a node of this list.
+
+        Raises:
+            ValueError: if other is this list.
+        """
+        if other is self:
+            raise ValueError('Cannot splice a LinkedList into itself')
+        if node is self.tail or other.head is None:
+            self.extend_from(other)
+            return
+        first, last = other.head, other.tail
+        after = self.head if node is None else node.next
+        #link first after node, or make it the head
+        first.prev = node
+        if node is None:
+            self.head = first
+        else:
+            node.next = first
+        #and last before the node that used to follow
+        last.next = after
+        after.prev = last
+        self.length += other.length
+        self.finger = None
+        other._clear()
+        if self.filter is not None or self.node_index is not None:
+            current = first
+            while current is not after:
+                if self.filter is not None:
+                    self.filter.add(current.value)
+                if self.node_index is not None:
+                    self._index(current)
+                current = current.next
+
+    def split_at(self, node):
+        """Cut this list just before node and return a new list holding node
+        and every node after it. The nodes are relinked rather than copied,
+        but finding the two new lengths walks from node toward both ends at
+        once, so it takes O(min(k, n - k)) for a cut k nodes from the end.
+        The new list starts without a filter or index, and moved values are
+        dropped from this list's, which takes a pass over the moved nodes.
+        node must be a node of this list.
+        """
+        #count the shorter side by walking outward from node
+        ahead, behind, steps = node, node.prev, 0
+        while ahead is not None and behind is not None:
+            ahead, behind = ahead.next, behind.prev
+            steps += 1
+        moved = steps if ahead is None else self.length - steps
+        if self.filter is not None or self.node_index is not None:
+            current = node
+            while current is not None:
+                if self.filter is not None:
+                    self.filter.remove(current.value)
+                if self.node_index is not None:
+                    self._unindex(current)
+                current = current.next
+        #unlink the run from node to the tail
+        other = type(self)()
+        other.head, other.tail, other.length = node, self.tail, moved
+        self.tail = node.prev
+        if node.prev is None:
+            self.head = None
+        else:
+            node.prev.next = None
+            node.prev = None
+        self.length -= moved
+        if self.finger is not None and self.finger[1] >= self.length:
+            self.finger = None
+        return other
+
 
 class Deque(LinkedList):
     '''Deque data structure class.
@@ -276,17 +504,21 @@ class Deque(LinkedList):
             raise ValueError('LinkedList is empty')
         #reassign the tail and head if it is the only element
         if len(self) == 1:
-            data = self.tail.value
+            node = self.tail
+            data = node.value
             self.tail = None
             self.head = None
             self.length -= 1
+            self._forget(node)
             return data
         #if it is more than one element just remove element on the end and reassign
         else:
-            data = self.tail.value
+            node = self.tail
+            data = node.value
             self.tail = self.tail.prev
             self.tail.next = None
             self.length -= 1
+            self._forget(node)
             return data
 
     def popleft(self):
@@ -296,19 +528,34 @@ class Deque(LinkedList):
             raise ValueError('LinkedList is empty')
         #check if length 1 and reassign head and tail
         if len(self) == 1:
-            data = self.head.value
+            node = self.head
+            data = node.value
             self.tail = None
             self.head = None
             self.length -= 1
+            self._forget(node)
             return data
         #reassign head and assign previous element
         else:
-            data = self.head.value
+            node = self.head
+            data = node.value
             self.head = self.head.next
             self.head.prev = None
             self.length -= 1
+            self._forget(node)
             return data
 
+    def _forget(self, node):
+        """Take a popped node out of the filter and the index, if there are
+        any, and drop the finger, whose node or index the pop may have
+        invalidated.
+        """
+        self.finger = None
+        if self.filter is not None:
+            self.filter.remove(node.value)
+        if self.node_index is not None:
+            self._unindex(node)
+
     def appendleft(self, new):
         '''appends to the first part of the deque'''
         #use insert in the 0th position
@@ -323,14 +570,581 @@ class Deque(LinkedList):
         raise NotImplementedError("Use append() or appendleft() for removal")
 
 
-def prob7(infile, outfile):
+class RingDeque:
+    """Deque data structure class backed by a circular buffer. The values
+    live in one Python list that doubles when it fills, so append, appendleft,
+    pop, popleft and indexing are O(1) with no allocation per value.
+
+    If maxlen is given, the buffer never grows past it, and appending to a
+    full deque evicts a value from the opposite end.
+
+    Attributes:
+        buffer (list): the slots holding the values, with None in free slots.
+        start (int): the slot holding the first value.
+        maxlen (int): the most values the deque can hold, or None.
+    """
+    def __init__(self, maxlen=None):
+        """Initialize an empty deque holding at most maxlen values.
+
+        Raises:
+            ValueError: if maxlen is negative.
+        """
+        if maxlen is not None and maxlen < 0:
+            raise ValueError('maxlen must be non-negative')
+        self.maxlen = maxlen
+        size = 8 if maxlen is None else min(8, maxlen)
+        self.buffer = [None] * size
+        self.start = 0
+        self.length = 0
+
+    def _grow(self):
+        """Unroll the values to the front of a buffer twice as large, capped
+        at maxlen.
+        """
+        size = 2 * len(self.buffer)
+        if self.maxlen is not None:
+            size = min(size, self.maxlen)
+        self.buffer = (self.buffer[self.start:] + self.buffer[:self.start]
+                        + [None] * (size - len(self.buffer)))
+        self.start = 0
+
+    def append(self, data):
+        """Append the data to the right end, evicting the leftmost value if
+        the deque is full at maxlen.
+        """
+        if self.length == len(self.buffer):
+            if self.length == self.maxlen:
+                #overwrite the leftmost value and shift the start past it
+                if self.maxlen:
+                    self.buffer[self.start] = data
+                    self.start = (self.start + 1) % len(self.buffer)
+                return
+            self._grow()
+        self.buffer[(self.start + self.length) % len(self.buffer)] = data
+        self.length += 1
+
+    def appendleft(self, data):
+        """Append the data to the left end, evicting the rightmost value if
+        the deque is full at maxlen.
+        """
+        if self.length == len(self.buffer):
+            if self.length == self.maxlen:
+                #the slot before the start holds the rightmost value
+                if self.maxlen:
+                    self.start = (self.start - 1) % len(self.buffer)
+                    self.buffer[self.start] = data
+                return
+            self._grow()
+        self.start = (self.start - 1) % len(self.buffer)
+        self.buffer[self.start] = data
+        self.length += 1
+
+    def pop(self):
+        """Remove and return the rightmost value.
+
+        Raises:
+            ValueError: if the deque is empty.
+        """
+        if self.length == 0:
+            raise ValueError('RingDeque is empty')
+        self.length -= 1
+        i = (self.start + self.length) % len(self.buffer)
+        data = self.buffer[i]
+        self.buffer[i] = None
+        return data
+
+    def popleft(self):
+        """Remove and return the leftmost value.
+
+        Raises:
+            ValueError: if the deque is empty.
+        """
+        if self.length == 0:
+            raise ValueError('RingDeque is empty')
+        data = self.buffer[self.start]
+        self.buffer[self.start] = None
+        self.start = (self.start + 1) % len(self.buffer)
+        self.length -= 1
+        return data
+
+    def get(self, i):
+        """Return the i-th value from the left without removing it.
+
+        Raises:
+            IndexError: if i is negative or greater than or equal to the
+                current number of values.
+        """
+        if i < 0 or i >= self.length:
+            raise IndexError('RingDeque index out of range')
+        return self.buffer[(self.start + i) % len(self.buffer)]
+
+    def __getitem__(self, i):
+        """Return the i-th value, counting from the right if i is negative."""
+        if i < 0:
+            i += self.length
+        return self.get(i)
+
+    def __iter__(self):
+        """Iterate over the values from left to right."""
+        for i in range(self.length):
+            yield self.buffer[(self.start + i) % len(self.buffer)]
+
+    def __len__(self):
+        """Return the number of values in the deque."""
+        return self.length
+
+    def __str__(self):
+        """String representation: the same as a standard Python list."""
+        return '[' + ', '.join(repr(value) for value in self) + ']'
+
+
+class ConcurrentDeque:
+    """Deque data structure class that can be shared between threads and
+    asyncio tasks. The values live in a RingDeque guarded by a lock. Pops
+    block until a value arrives, and if capacity is given, appends block
+    until there is room, so producers slow down to match the consumers.
+
+    Threads wait on condition variables, and coroutines wait on futures that
+    are resolved through their own event loop, so neither side polls.
+
+    Attributes:
+        ring (RingDeque): the values in the deque.
+        capacity (int): the most values the deque holds, or None.
+    """
+    def __init__(self, capacity=None):
+        """Initialize an empty deque holding at most capacity values.
+
+        Raises:
+            ValueError: if capacity is less than 1.
+        """
+        if capacity is not None and capacity < 1:
+            raise ValueError('capacity must be at least 1')
+        self.ring = RingDeque()
+        self.capacity = capacity
+        self.lock = threading.Lock()
+        self.not_empty = threading.Condition(self.lock)
+        self.not_full = threading.Condition(self.lock)
+        self.getters = deque()      # Futures of coroutines waiting for data.
+        self.putters = deque()      # Futures of coroutines waiting for room.
+
+    def _has_data(self):
+        """Return True if there is a value to pop."""
+        return len(self.ring) > 0
+
+    def _has_room(self):
+        """Return True if a value can be appended without blocking."""
+        return self.capacity is None or len(self.ring) < self.capacity
+
+    @staticmethod
+    def _resolve(future):
+        """Wake the coroutine awaiting the future, unless it was cancelled."""
+        if not future.done():
+            future.set_result(None)
+
+    @staticmethod
+    def _wake(waiters, n=1):
+        """Wake up to n of the coroutines waiting on futures in waiters."""
+        while n > 0 and waiters:
+            future = waiters.popleft()
+            future.get_loop().call_soon_threadsafe(
+                                        ConcurrentDeque._resolve, future)
+            n -= 1
+
+    def _added(self):
+        """Wake a thread and a coroutine waiting for data."""
+        self.not_empty.notify()
+        self._wake(self.getters)
+
+    def _removed(self, n):
+        """Wake threads and coroutines waiting for the n freed slots."""
+        self.not_full.notify(n)
+        self._wake(self.putters, n)
+
+    def _wait(self, condition, ready, block, timeout, message):
+        """With the lock held, wait on the condition until ready() is True.
+
+        Raises:
+            ValueError: if block is False and ready() is False.
+            TimeoutError: if ready() is still False after timeout seconds.
+        """
+        if not ready():
+            if not block:
+                raise ValueError(message)
+            if not condition.wait_for(ready, timeout):
+                raise TimeoutError(message)
+
+    def _push(self, data, left, block, timeout):
+        """Append data to either end once there is room."""
+        with self.lock:
+            self._wait(self.not_full, self._has_room, block, timeout,
+                                                'ConcurrentDeque is full')
+            if left:
+                self.ring.appendleft(data)
+            else:
+                self.ring.append(data)
+            self._added()
+
+    def _take(self, left, block, timeout):
+        """Remove and return a value from either end once there is one."""
+        with self.lock:
+            self._wait(self.not_empty, self._has_data, block, timeout,
+                                                'ConcurrentDeque is empty')
+            data = self.ring.popleft() if left else self.ring.pop()
+            self._removed(1)
+            return data
+
+    def append(self, data, block=True, timeout=None):
+        """Append the data to the right end, waiting up to timeout seconds
+        (forever if None) for room if the deque is at capacity.
+
+        Raises:
+            ValueError: if block is False and the deque is full.
+            TimeoutError: if there is still no room after timeout seconds.
+        """
+        self._push(data, False, block, timeout)
+
+    def appendleft(self, data, block=True, timeout=None):
+        """Append the data to the left end, waiting like append()."""
+        self._push(data, True, block, timeout)
+
+    def pop(self, block=True, timeout=None):
+        """Remove and return the rightmost value, waiting up to timeout
+        seconds (forever if None) for one to arrive.
+
+        Raises:
+            ValueError: if block is False and the deque is empty.
+            TimeoutError: if the deque is still empty after timeout seconds.
+        """
+        return self._take(False, block, timeout)
+
+    def popleft(self, block=True, timeout=None):
+        """Remove and return the leftmost value, waiting like pop()."""
+        return self._take(True, block, timeout)
+
+    def popmany(self, n, block=True, timeout=None):
+        """Remove and return a list of up to n values from the left end,
+        waiting like popleft() for the first one, then taking whatever else
+        is there under the same lock.
+
+        Raises:
+            ValueError: if block is False and the deque is empty.
+            TimeoutError: if the deque is still empty after timeout seconds.
+        """
+        with self.lock:
+            self._wait(self.not_empty, self._has_data, block, timeout,
+                                                'ConcurrentDeque is empty')
+            values = [self.ring.popleft()
+                        for i in range(min(n, len(self.ring)))]
+            self._removed(len(values))
+            return values
+
+    async def _sleep(self, future, waiters, ready):
+        """Await a future from waiters. If the waiting coroutine is cancelled
+        after the future was already handed a wakeup, pass it on.
+        """
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self.lock:
+                if future in waiters:
+                    waiters.remove(future)
+                elif ready():
+                    self._wake(waiters)
+            raise
+
+    async def get(self):
+        """Remove and return the leftmost value, suspending the calling
+        coroutine until one arrives. Use asyncio.wait_for() for a timeout.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            with self.lock:
+                if self._has_data():
+                    data = self.ring.popleft()
+                    self._removed(1)
+                    return data
+                future = loop.create_future()
+                self.getters.append(future)
+            await self._sleep(future, self.getters, self._has_data)
+
+    async def put(self, data):
+        """Append the data to the right end, suspending the calling coroutine
+        until there is room.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            with self.lock:
+                if self._has_room():
+                    self.ring.append(data)
+                    self._added()
+                    return
+                future = loop.create_future()
+                self.putters.append(future)
+            await self._sleep(future, self.putters, self._has_room)
+
+    def __len__(self):
+        """Return the number of values in the deque."""
+        return len(self.ring)
+
+
+class UnrolledListNode:
+    """A node class for unrolled linked lists. Holds a Python list of up to
+    capacity values instead of a single value, plus references to the next
+    and previous nodes.
+    """
+    __slots__ = ('values', 'next', 'prev')
+
+    def __init__(self, values=None):
+        """Store the values and initialize the next and previous nodes."""
+        self.values = [] if values is None else values
+        self.next = None
+        self.prev = None
+
+
+class UnrolledLinkedList:
+    """Unrolled doubly linked list data structure class. Each node stores a
+    chunk of values, so the list uses far fewer node objects than LinkedList
+    and get(i) skips a whole chunk per step.
+
+    Unlike LinkedList, get() returns the i-th value itself and find()
+    returns the index of the data, since values have no node of their own.
+
+    Attributes:
+        head (UnrolledListNode): the first chunk in the list.
+        tail (UnrolledListNode): the last chunk in the list.
+        capacity (int): the most values a chunk can hold.
+    """
+    def __init__(self, capacity=64):
+        """Initialize an empty list whose chunks hold up to capacity values.
+
+        Raises:
+            ValueError: if capacity is less than 2.
+        """
+        if capacity < 2:
+            raise ValueError('capacity must be at least 2')
+        self.head = None
+        self.tail = None
+        self.length = 0
+        self.capacity = capacity
+
+    @staticmethod
+    def _check(data):
+        """Raise a TypeError if data is not of type int, float, or str."""
+        if type(data) != str and type(data) != int and type(data) != float:
+            raise TypeError('Input must be int, float, or str')
+
+    def _locate(self, i):
+        """Return the chunk holding the i-th value and i's offset in it,
+        walking from whichever end of the list is nearer.
+        """
+        if i < self.length - i:
+            node = self.head
+            while i >= len(node.values):
+                i -= len(node.values)
+                node = node.next
+        else:
+            node = self.tail
+            i = self.length - i
+            while i > len(node.values):
+                i -= len(node.values)
+                node = node.prev
+            i = len(node.values) - i
+        return node, i
+
+    def _split(self, node):
+        """Move the upper half of a full chunk into a new chunk after it."""
+        half = len(node.values) // 2
+        new_node = UnrolledListNode(node.values[half:])
+        del node.values[half:]
+        new_node.prev = node
+        new_node.next = node.next
+        if node.next is None:
+            self.tail = new_node
+        else:
+            node.next.prev = new_node
+        node.next = new_node
+
+    def _unlink(self, node):
+        """Remove a chunk from the list of chunks."""
+        if node.prev is None:
+            self.head = node.next
+        else:
+            node.prev.next = node.next
+        if node.next is None:
+            self.tail = node.prev
+        else:
+            node.next.prev = node.prev
+
+    def append(self, data):
+        """Append the data to the end of the list."""
+        self._check(data)
+        if self.tail is None:
+            self.head = self.tail = UnrolledListNode()
+        elif len(self.tail.values) == self.capacity:
+            #start a new chunk rather than splitting a full one
+            new_node = UnrolledListNode()
+            new_node.prev = self.tail
+            self.tail.next = new_node
+            self.tail = new_node
+        self.tail.values.append(data)
+        self.length += 1
+
+    def insert(self, index, data):
+        """Insert the data into the list immediately before the value at the
+        index-th location.
+
+        Raises:
+            IndexError: if index is negative or strictly greater than the
+                current number of values.
+        """
+        if index > len(self) or index < 0:
+            raise IndexError('Invalid index')
+        if index == len(self):
+            self.append(data)
+            return
+        self._check(data)
+        node, i = self._locate(index)
+        #split a full chunk and insert into whichever half holds i
+        if len(node.values) == self.capacity:
+            self._split(node)
+            if i > len(node.values):
+                i -= len(node.values)
+                node = node.next
+        node.values.insert(i, data)
+        self.length += 1
+
+    def get(self, i):
+        """Return the i-th value in the list.
+
+        Raises:
+            IndexError: if i is negative or greater than or equal to the
+                current number of values.
+
+        Examples:
+            >>> l = UnrolledLinkedList()
+            >>> for x in ['a', 'b', 'c', 'd', 'e']:
+            ...     l.append(x)
+            ...
+            >>> l.get(3)
+            'd'
+        """
+        if i < 0 or i >= len(self):
+            raise IndexError('UnrolledLinkedList index out of range')
+        node, i = self._locate(i)
+        return node.values[i]
+
+    def find(self, data):
+        """Return the index of the first value in the list equal to the data.
+
+        Raises:
+            ValueError: if the list does not contain the data.
+        """
+        index = 0
+        node = self.head
+        #search each chunk with list.index
+        while node is not None:
+            if data in node.values:
+                return index + node.values.index(data)
+            index += len(node.values)
+            node = node.next
+        raise ValueError('Data is not in UnrolledLinkedList')
+
+    def remove(self, data):
+        """Remove the first value in the list equal to the data. A chunk
+        that falls below half full absorbs the next chunk if they fit in one.
+
+        Raises:
+            ValueError: if the list is empty or does not contain the data.
+        """
+        node = self.head
+        while node is not None and data not in node.values:
+            node = node.next
+        if node is None:
+            raise ValueError('Data is not in UnrolledLinkedList')
+        node.values.remove(data)
+        self.length -= 1
+        if not node.values:
+            self._unlink(node)
+        elif (2*len(node.values) < self.capacity and node.next is not None
+                and len(node.values) + len(node.next.values) <= self.capacity):
+            node.values.extend(node.next.values)
+            self._unlink(node.next)
+
+    def __iter__(self):
+        """Iterate over the values in the list in order."""
+        node = self.head
+        while node is not None:
+            yield from node.values
+            node = node.next
+
+    def __len__(self):
+        """Return the number of values in the list."""
+        return self.length
+
+    def __str__(self):
+        """String representation: the same as a standard Python list."""
+        return '[' + ', '.join(repr(value) for value in self) + ']'
+
+
+def reverse_lines(infile, outfile, block_size=2**16):
+    """Reverse the contents of a file by line, reading it backwards in
+    blocks so that memory stays bounded by block_size plus the longest line.
+    The output matches prob7: every piece between newlines, including the
+    empty piece after a final newline, is written followed by a newline.
+
+    The file is read as bytes and split on b'\n', so encodings pass through
+    unchanged. A '\r\n' line ending is written as '\n', as text mode does
+    for prob7, but a lone '\r' is kept as data rather than read as a line
+    break.
+
+    Parameters:
+        infile (str): the file to read from.
+        outfile (str): the file to write to.
+        block_size (int): the number of bytes to read at a time.
+    """
+    with open(infile, 'rb') as rfile, open(outfile, 'wb') as wfile:
+        position = rfile.seek(0, os.SEEK_END)
+        #pieces of the line that runs into the blocks already read, last first
+        partial = []
+        #the piece after the last newline has no line ending to normalize
+        at_end = True
+        while position > 0:
+            size = min(block_size, position)
+            position -= size
+            rfile.seek(position)
+            lines = rfile.read(size).split(b'\n')
+            if len(lines) == 1:
+                partial.append(lines[0])
+                continue
+            #the end of this block starts the carried-over line
+            partial.append(lines.pop())
+            line = b''.join(reversed(partial)) + b'\n'
+            wfile.write(line if at_end else line.replace(b'\r\n', b'\n'))
+            at_end = False
+            #every piece here was followed by a newline in the file
+            if len(lines) > 1:
+                wfile.write((b'\n'.join(reversed(lines[1:])) + b'\n')
+                            .replace(b'\r\n', b'\n'))
+            partial = [lines[0]]
+        line = b''.join(reversed(partial)) + b'\n'
+        wfile.write(line if at_end else line.replace(b'\r\n', b'\n'))
+
+
+def prob7(infile, outfile, streaming=False):
     """Reverse the contents of a file by line and write the results to
     another file.
 
     Parameters:
         infile (str): the file to read from.
         outfile (str): the file to write to.
+        streaming (bool): if True, use reverse_lines() to read the file
+            backwards in blocks instead of loading it all into a Deque.
+            The output is the same, except that a lone '\r' is not
+            treated as a line break.
     """
+    if streaming:
+        reverse_lines(infile, outfile)
+        return
     #open file for reading
     with open(infile,'r') as file:
         #split it by newlines
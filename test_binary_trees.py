@@ -0,0 +1,226 @@
+# test_binary_trees.py
+
+
+import random
+
+import pytest
+
+import binary_trees
+
+
+def check_tree(tree, balanced=True):
+    """Walk the tree without recursion, assert that every node's parent link,
+    order, stored height and subtree size are right (and that it is AVL
+    balanced, if balanced is True), and return the values in order.
+    """
+    root = tree.root
+    if root is None:
+        return []
+    assert root.prev is None, 'root has a parent'
+    #postorder with an explicit stack, so deep trees cannot overflow
+    stack, done = [(root, None, None, False)], []
+    while stack:
+        n, low, high, visited = stack.pop()
+        if not visited:
+            assert low is None or low < n.value, 'BST order broken'
+            assert high is None or n.value < high, 'BST order broken'
+            stack.append((n, low, high, True))
+            for child, lo, hi in ((n.right, n.value, high),
+                                  (n.left, low, n.value)):
+                if child is not None:
+                    assert child.prev is n, 'wrong parent link'
+                    stack.append((child, lo, hi, False))
+            continue
+        heights = [-1 if c is None else c.height for c in (n.left, n.right)]
+        sizes = [0 if c is None else c.size for c in (n.left, n.right)]
+        assert n.height == 1 + max(heights), 'stale height'
+        #scapegoat tombstones do not count towards the size
+        own = 0 if getattr(n, 'deleted', False) else 1
+        assert n.size == own + sum(sizes), 'stale size'
+        if balanced:
+            assert abs(heights[0] - heights[1]) <= 1, 'AVL balance broken'
+    values = list(tree)
+    assert values == sorted(values) and len(values) == len(tree)
+    return values
+
+
+@pytest.mark.parametrize('cls', [binary_trees.BST, binary_trees.AVL])
+def test_insert_remove_against_set(cls):
+    rng = random.Random(1)
+    tree, model = cls(), set()
+    for _ in range(2000):
+        x = rng.randrange(300)
+        if x in model and rng.random() < .5:
+            tree.remove(x)
+            model.discard(x)
+        elif x not in model:
+            tree.insert(x)
+            model.add(x)
+        else:
+            with pytest.raises(ValueError):
+                tree.insert(x)
+    assert check_tree(tree, cls is binary_trees.AVL) == sorted(model)
+    with pytest.raises(ValueError):
+        tree.remove(-1)
+
+
+def test_avl_sequential_inserts_stay_shallow():
+    tree = binary_trees.AVL()
+    for i in range(2**12):
+        tree.insert(i)
+    check_tree(tree)
+    assert tree.root.height <= 13, 'sorted inserts should not degenerate'
+    for i in range(0, 2**12, 2):
+        tree.remove(i)
+    assert check_tree(tree) == list(range(1, 2**12, 2))
+
+
+@pytest.mark.parametrize('cls', [binary_trees.BST, binary_trees.AVL])
+def test_insert_many_find_many(cls):
+    rng = random.Random(2)
+    tree, model = cls(), set()
+    for _ in range(30):
+        batch = set(rng.sample(range(5000), rng.randrange(1, 200))) - model
+        tree.insert_many(batch)
+        model |= batch
+        for x in rng.sample(sorted(model), min(20, len(model))):
+            tree.remove(x)
+            model.discard(x)
+        assert check_tree(tree, cls is binary_trees.AVL) == sorted(model)
+    #small batches take the per-key path, large ones the shared walk
+    for size in (5, len(model)):
+        queries = rng.sample(sorted(model), size) * 2
+        assert [n.value for n in tree.find_many(queries)] == queries
+    with pytest.raises(ValueError):
+        tree.find_many([min(model), -1])
+    #a duplicate leaves the tree unchanged
+    with pytest.raises(ValueError):
+        tree.insert_many([-5, -4, min(model)])
+    with pytest.raises(ValueError):
+        tree.insert_many([-5, -5])
+    assert -5 not in tree and check_tree(tree, False) == sorted(model)
+
+
+def test_avl_split_join_union():
+    rng = random.Random(3)
+    values = sorted(rng.sample(range(10**6), 3000))
+    tree = binary_trees.AVL.from_iterable(values)
+    for _ in range(50):
+        pivot = rng.randrange(-10, 10**6 + 10)
+        low, high = tree.split(pivot)
+        assert tree.root is None, 'split should empty the tree'
+        assert check_tree(low) == [x for x in values if x < pivot]
+        assert check_tree(high) == [x for x in values if x >= pivot]
+        tree = binary_trees.AVL.join(low, high)
+        assert low.root is None and high.root is None
+        assert check_tree(tree) == values
+    with pytest.raises(ValueError):
+        binary_trees.AVL.join(binary_trees.AVL.from_sorted([5, 6]),
+                              binary_trees.AVL.from_sorted([6, 7]))
+    other = binary_trees.AVL.from_iterable(rng.sample(range(10**6), 500))
+    union = tree.union(other)
+    assert check_tree(union) == sorted(set(values) | set(other))
+
+
+def check_scapegoat(tree):
+    """Assert the tombstone counts of a ScapegoatTree and that no subtree
+    holds more tombstones than live nodes, and return the live values.
+    """
+    check_tree(tree, balanced=False)
+    dead, stack = 0, [] if tree.root is None else [tree.root]
+    while stack:
+        n = stack.pop()
+        children = [c for c in (n.left, n.right) if c is not None]
+        assert n.total == 1 + sum(c.total for c in children), 'stale total'
+        assert 2 * n.size >= n.total, 'subtree should have been rebuilt'
+        dead += n.deleted
+        stack.extend(children)
+    assert dead == tree.dead, 'wrong tombstone count'
+    return list(tree)
+
+
+def test_scapegoat_against_set():
+    rng = random.Random(4)
+    tree, model = binary_trees.ScapegoatTree(alpha=.6), set()
+    for step in range(4000):
+        x = rng.randrange(1000)
+        if x in model:
+            tree.remove(x)
+            model.discard(x)
+            assert tree.get(x) is None and x not in tree
+        else:
+            tree.insert(x)
+            model.add(x)
+        if step % 100 == 0:
+            assert check_scapegoat(tree) == sorted(model)
+            assert tree.count_range(200, 600) == len(
+                [y for y in model if 200 <= y <= 600])
+    assert check_scapegoat(tree) == sorted(model)
+    assert list(reversed(tree)) == sorted(model, reverse=True)
+    with pytest.raises(ValueError):
+        tree.remove(-1)
+    with pytest.raises(ValueError):
+        binary_trees.ScapegoatTree(alpha=.4)
+
+
+def test_scapegoat_sorted_inserts_stay_shallow():
+    tree = binary_trees.ScapegoatTree()
+    for i in range(4096):
+        tree.insert(i)
+    check_scapegoat(tree)
+    #log base 3/2 of 4096 is about 20.5
+    assert tree.root.height <= 22, 'scapegoat rebuilds should bound depth'
+
+
+def test_bplus_tree_insert_close_reopen(tmp_path):
+    rng = random.Random(5)
+    filename = str(tmp_path / 'words.idx')
+    words = set()
+    #small pages force leaf and internal splits
+    with binary_trees.DiskBPlusTree(filename, key_size=8,
+                                    page_size=128) as index:
+        for _ in range(2000):
+            word = ''.join(rng.choice('abcdef') for _ in range(rng.randrange(1, 9)))
+            if word in words:
+                with pytest.raises(ValueError):
+                    index.insert(word)
+            else:
+                index.insert(word)
+                words.add(word)
+    with binary_trees.DiskBPlusTree(filename) as index:
+        assert index.key_size == 8 and index.page_size == 128
+        assert len(index) == len(words) and list(index) == sorted(words)
+        for word in rng.sample(sorted(words), 50):
+            assert index.find(word) == word and word in index
+        assert 'zzz' not in index and 5 not in index
+        with pytest.raises(ValueError):
+            index.find('zzz')
+        #bounds longer than a key are clamped rather than rejected
+        assert list(index.irange('b', 'cffffffffff')) == [
+            w for w in sorted(words) if 'b' <= w <= 'cffffffffff']
+        assert list(index.irange('bbbbbbbbbb')) == [
+            w for w in sorted(words) if 'bbbbbbbbbb' <= w]
+
+
+def test_bplus_tree_bulk_load(tmp_path):
+    filename = str(tmp_path / 'ints.idx')
+    values = list(range(-5000, 5000, 3))
+    with binary_trees.DiskBPlusTree.bulk_load(filename, values, key_type=int,
+                                              page_size=256) as index:
+        assert list(index) == values
+        index.insert(2)
+        index.insert(-2**63)
+    with binary_trees.DiskBPlusTree(filename) as index:
+        expected = sorted(values + [2, -2**63])
+        assert list(index) == expected and len(index) == len(expected)
+        assert list(index.irange(-10, 10)) == [x for x in expected
+                                               if -10 <= x <= 10]
+        assert list(index.irange(2**70)) == [] and 'a' not in index
+    #a failed rebuild leaves the old index and no stray files behind
+    with pytest.raises(ValueError):
+        binary_trees.DiskBPlusTree.bulk_load(filename, [3, 2], key_type=int)
+    with pytest.raises(ValueError):
+        binary_trees.DiskBPlusTree.bulk_load(filename, ['x' * 40])
+    assert [p.name for p in tmp_path.iterdir()] == ['ints.idx']
+    with binary_trees.DiskBPlusTree(filename) as index:
+        assert len(index) == len(values) + 2
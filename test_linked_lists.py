@@ -0,0 +1,142 @@
+# test_linked_lists.py
+
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+import linked_lists
+
+
+def test_concurrent_deque_threads_bounded():
+    q = linked_lists.ConcurrentDeque(capacity=4)
+    got, lock = [], threading.Lock()
+
+    def produce(k):
+        for i in range(2000):
+            q.append((k, i))
+
+    def consume():
+        while True:
+            x = q.popleft(timeout=10)
+            if x is None:
+                return
+            assert len(q) <= 4
+            with lock:
+                got.append(x)
+
+    producers = [threading.Thread(target=produce, args=(k,)) for k in range(3)]
+    consumers = [threading.Thread(target=consume) for _ in range(3)]
+    for t in producers + consumers:
+        t.start()
+    for t in producers:
+        t.join(10)
+    #one stop marker per consumer, sent after all the data
+    for _ in consumers:
+        q.append(None, timeout=10)
+    for t in consumers:
+        t.join(10)
+    assert not any(t.is_alive() for t in producers + consumers), 'deadlock'
+    assert sorted(got) == [(k, i) for k in range(3) for i in range(2000)]
+
+
+def test_concurrent_deque_popmany_keeps_order():
+    q = linked_lists.ConcurrentDeque(capacity=2)
+    batches = []
+
+    def consume():
+        while sum(map(len, batches)) < 1000:
+            batches.append(q.popmany(5, timeout=10))
+
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    for i in range(1000):
+        q.append(i, timeout=10)
+    consumer.join(10)
+    assert not consumer.is_alive(), 'deadlock'
+    assert [x for batch in batches for x in batch] == list(range(1000))
+    assert max(map(len, batches)) <= 2, 'popmany took more than capacity'
+
+
+def test_concurrent_deque_timeouts():
+    q = linked_lists.ConcurrentDeque(capacity=1)
+    with pytest.raises(ValueError):
+        q.pop(block=False)
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        q.popleft(timeout=.05)
+    assert time.monotonic() - start >= .04
+    q.append(1)
+    with pytest.raises(TimeoutError):
+        q.append(2, timeout=.05)
+    with pytest.raises(ValueError):
+        q.appendleft(2, block=False)
+    assert q.pop() == 1 and len(q) == 0
+    with pytest.raises(ValueError):
+        linked_lists.ConcurrentDeque(capacity=0)
+
+
+def test_concurrent_deque_threads_and_coroutines():
+    async def main():
+        q = linked_lists.ConcurrentDeque(capacity=8)
+        got = []
+
+        async def consume():
+            while True:
+                x = await q.get()
+                if x is None:
+                    return
+                got.append(x)
+
+        async def produce():
+            for i in range(1000):
+                await q.put(-i - 1)
+
+        def produce_thread():
+            for i in range(1000):
+                q.append(i)
+
+        consumers = [asyncio.create_task(consume()) for _ in range(4)]
+        threads = [threading.Thread(target=produce_thread) for _ in range(2)]
+        for t in threads:
+            t.start()
+        await asyncio.gather(produce(), produce())
+        await asyncio.to_thread(lambda: [t.join(10) for t in threads])
+        for _ in consumers:
+            await q.put(None)
+        await asyncio.wait_for(asyncio.gather(*consumers), 10)
+        assert sorted(got) == sorted(list(range(1000)) * 2
+                                     + [-i - 1 for i in range(1000)] * 2)
+
+        #a thread blocked in pop() wakes for a coroutine's put()
+        result = []
+        waiter = threading.Thread(
+            target=lambda: result.append(q.pop(timeout=5)))
+        waiter.start()
+        await asyncio.sleep(.05)
+        await q.put('x')
+        await asyncio.to_thread(waiter.join, 5)
+        assert result == ['x']
+
+    asyncio.run(main())
+
+
+def test_concurrent_deque_cancellation():
+    async def main():
+        q = linked_lists.ConcurrentDeque()
+        first = asyncio.create_task(q.get())
+        second = asyncio.create_task(q.get())
+        await asyncio.sleep(0)
+        #the wakeup for first is passed on to second when first is cancelled
+        q.append('x')
+        first.cancel()
+        results = await asyncio.wait_for(
+            asyncio.gather(first, second, return_exceptions=True), 1)
+        assert 'x' in results
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(q.get(), .05)
+        assert not q.getters, 'cancelled waiters must be dropped'
+
+    asyncio.run(main())